@@ -1,3 +1,10 @@
+import mmap
+import os
+import re
+import sys
+import tempfile
+import time
+
 def extract_digits_manual(text):
     extracted_numbers = []
     current_num = ""
@@ -19,7 +26,134 @@ def extract_digits_manual(text):
         
     return extracted_numbers
 
+# Bulk extraction over bytes / mmap
+# Same phone pattern as Lab.ipynb, compiled for bytes, with (?<!\d) so that a
+# phone number never starts in the middle of a digit run.
+PHONE_PATTERN = rb'(?:\+?\d{1,3}[-.\s]?)?(?:\(?\d{2,4}\)?[-.\s]?){2,3}\d{3,4}'
+PHONE = re.compile(rb'(?<!\d)' + PHONE_PATTERN)
+DIGITS = re.compile(rb'\d+')
+
+# Where a phone match may begin: a digit, '+' or '(' (the latter two followed
+# by a digit) that is not preceded by a digit, with at least 7 digits ahead
+# joined only by separators the phone pattern allows. This is a necessary
+# condition, checked in C; the backtracking-heavy PHONE pattern is only run
+# at positions that pass it. The pattern starts with a character class, so
+# the regex engine skips everything else without entering the pattern.
+PHONE_CANDIDATE = re.compile(
+    rb'(?:\d|[+(](?=\d))(?<!\d[\d+(])(?=(?:\)?[-.\s]?\(?\d){6})'
+)
+
+# Longest possible PHONE match: '+ddd-' (5) + three '(dddd)-' groups (21)
+# + 'dddd' (4). Used as the look-ahead margin past a window cut.
+PHONE_MAX_LENGTH = 30
+NON_DIGIT = re.compile(rb'\D')
+
+def number_spans_in(buffer, start, end, phone_end=None):
+    """
+    Sorted (start, end, kind) spans starting in buffer[start:end] (see
+    iter_number_spans), and the end of the last phone found.
+
+    `end` must not fall inside a digit run. A phone starting before `end`
+    may extend past it: the phone pattern is allowed to look up to
+    PHONE_MAX_LENGTH bytes further. phone_end is where the previous
+    window's last phone ended; no phone may start before it.
+    """
+    spans = [(run.start(), run.end(), 'DIGITS') for run in DIGITS.finditer(buffer, start, end)]
+
+    # Phones do not overlap, as with findall
+    phone_end = start if phone_end is None else phone_end
+    limit = min(len(buffer), end + PHONE_MAX_LENGTH)
+    for candidate in PHONE_CANDIDATE.finditer(buffer, start, limit):
+        position = candidate.start()
+        if position >= end:
+            break
+        if position < phone_end:
+            continue
+        phone = PHONE.match(buffer, position, limit)
+        if phone:
+            phone_end = phone.end()
+            spans.append((position, phone_end, 'PHONE'))
+
+    spans.sort()
+    return spans, phone_end
+
+def iter_number_spans(buffer, window=1 << 20):
+    """
+    Single sequential pass over a bytes-like object (bytes, bytearray,
+    memoryview or mmap), yielding (start, end, kind) spans with kind 'DIGITS'
+    or 'PHONE', ordered by start offset.
+
+    DIGITS spans are exactly the runs extract_digits_manual() returns (ASCII
+    digits only), including the runs inside phone numbers. PHONE spans are
+    the Lab.ipynb matches that do not start inside a digit run.
+
+    The buffer is processed in windows of `window` bytes, each cut moved
+    forward only past a digit run (which is a single span), so memory stays
+    bounded by one window's spans whatever the input looks like. A phone
+    crossing a cut is found by the window it starts in, and the next window
+    carries its end over. Nothing is copied out of the buffer, so an mmap'd
+    file is only paged in as it is scanned.
+    """
+    size = len(buffer)
+    start = 0
+    phone_end = 0
+    while start < size:
+        end = size
+        if start + window < size:
+            cut = NON_DIGIT.search(buffer, start + window)
+            end = cut.start() if cut else size
+        spans, phone_end = number_spans_in(buffer, start, end, phone_end)
+        yield from spans
+        start = end
+
+def extract_number_spans_from_file(path):
+    """Memory-map a file read-only and yield its number spans lazily."""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # Sequential scan: let the kernel read ahead and drop pages behind us
+            if hasattr(mm, 'madvise'):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            yield from iter_number_spans(mm)
+
+def benchmark_extraction(size_mb=20):
+    """MB/s of the mmap extractor against extract_digits_manual + a phone regex pass."""
+    line = (b"[2025-01-17 12:00:03] INFO checkout: order 45231 completed for user alice, "
+            b"total $99; support line +1-234-567-8901 (retry 2 of 5)\n")
+    data = line * (size_mb * 1024 * 1024 // len(line))
+
+    with tempfile.NamedTemporaryFile(delete=False) as f:
+        f.write(data)
+        path = f.name
+
+    try:
+        print(f"--- Extraction benchmark ({len(data) / 1e6:.1f} MB) ---")
+
+        # Current approach: decode, manual digit loop, then a second regex pass
+        start = time.perf_counter()
+        with open(path, encoding='ascii') as f:
+            text = f.read()
+        digits = extract_digits_manual(text)
+        phones = re.findall(PHONE.pattern.decode(), text)
+        old = time.perf_counter() - start
+        del text
+
+        start = time.perf_counter()
+        kinds = [kind for _, _, kind in extract_number_spans_from_file(path)]
+        new = time.perf_counter() - start
+
+        print(f"manual + regex   {old:8.3f}s  {len(data) / 1e6 / old:8.1f} MB/s")
+        print(f"mmap one-pass    {new:8.3f}s  {len(data) / 1e6 / new:8.1f} MB/s")
+        print(f"Same counts? {'Yes' if kinds.count('DIGITS') == len(digits) and kinds.count('PHONE') == len(phones) else 'No'}")
+    finally:
+        os.remove(path)
+
 if __name__ == "__main__":
+    if '--benchmark' in sys.argv:
+        benchmark_extraction()
+        sys.exit()
+
     # Test Data
     strings = ["Order ID: 45231", "Price: $99", "Year: 2025"]
     paragraph = "In 2023, the population increased by 15000. Contact us at 555-0199."
@@ -31,4 +165,9 @@ if __name__ == "__main__":
 
     print("\n--- Extracting from Paragraph (Manual Logic) ---")
     print(f"Paragraph: {paragraph}")
-    print(f"Digits found: {extract_digits_manual(paragraph)}")
\ No newline at end of file
+    print(f"Digits found: {extract_digits_manual(paragraph)}")
+
+    print("\n--- Bulk Extraction (bytes, one pass) ---")
+    data = b"My ID is 4567 and you can reach me at +1-234-567-8901 or 9876543210."
+    for start, end, kind in iter_number_spans(data):
+        print(f"{kind:<7} {data[start:end].decode()}")
\ No newline at end of file
@@ -1,4 +1,10 @@
+import io
+import os
 import re
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
 
 class ManualTokenizer:
     def __init__(self):
@@ -19,6 +25,17 @@ class ManualTokenizer:
             # Symbols/Punctuation: Any single non-word, non-whitespace character
             ('SYMBOL', re.compile(r'[^\w\s]'))
         ]
+
+        # Single-pass scanner: the same rules merged into one alternation with
+        # named groups. Alternation tries branches left to right, so the first
+        # rule that matches wins exactly as in the rule-by-rule loop, and
+        # whitespace is skipped inside the regex engine instead of in Python.
+        self.scanner = re.compile('|'.join(
+            f'(?P<{token_type}>{pattern.pattern})' for token_type, pattern in self.rules
+        ))
+
+        # Small-int code per rule, used by the compact span output
+        self.token_types = [token_type for token_type, _ in self.rules]
         
         # Map for expanding common contractions
         self.contraction_map = {
@@ -32,8 +49,66 @@ class ManualTokenizer:
             "they're": ["they", "are"]
         }
 
+    def expand_contraction(self, value, tokens):
+        """Append the expansion of a CONTRACTION match to tokens."""
+        # Check if we have a known expansion
+        lower_val = value.lower()
+        if lower_val in self.contraction_map:
+            tokens.extend(self.contraction_map[lower_val])
+        else:
+            # Fallback: split roughly (e.g., "John's" -> "John", "'s")
+            # This mimics simple rule-based splitting
+            if "'s" in value:
+                base, suffix = value.rsplit("'s", 1)
+                tokens.extend([base, "'s"])
+            elif "n't" in value:
+                base, suffix = value.rsplit("n't", 1)
+                tokens.extend([base, "not"])
+            else:
+                tokens.append(value)
+
     def tokenize(self, text):
         tokens = []
+
+        # One match call per token: finditer skips whitespace (and anything no
+        # rule accepts) in C, and lastgroup tells us which rule fired.
+        for match in self.scanner.finditer(text):
+            if match.lastgroup == 'CONTRACTION':
+                self.expand_contraction(match.group(), tokens)
+            else:
+                # For Abbreviations, Hyphenated, Words, and Symbols
+                tokens.append(match.group())
+
+        return tokens
+
+    def tokenize_spans(self, text):
+        """
+        Compact alternative to tokenize(): returns a TokenSpans holding
+        start/end offsets into text and a type code per token, without
+        creating a string for each token.
+        """
+        # Offsets past 4G characters do not fit in an unsigned 32-bit int
+        offset_code = 'I' if len(text) < 2 ** 32 else 'Q'
+        starts = array(offset_code)
+        ends = array(offset_code)
+        types = array('B')
+
+        for match in self.scanner.finditer(text):
+            start, end = match.span()
+            starts.append(start)
+            ends.append(end)
+            # Rule patterns have no capturing groups, so group N is rule N-1
+            types.append(match.lastindex - 1)
+
+        return TokenSpans(self, text, starts, ends, types)
+
+    def iter_tokenize(self, source, chunk_size=65536):
+        """Generator version of tokenize() for files and iterables of text."""
+        return iter_tokenize(source, chunk_size=chunk_size, tokenize=self.tokenize)
+
+    def tokenize_rulewise(self, text):
+        """Original position-by-position loop, kept as the reference engine."""
+        tokens = []
         position = 0
         length = len(text)
         
@@ -54,22 +129,7 @@ class ManualTokenizer:
                     value = match.group()
                     
                     if token_type == 'CONTRACTION':
-                        # Check if we have a known expansion
-                        lower_val = value.lower()
-                        if lower_val in self.contraction_map:
-                            tokens.extend(self.contraction_map[lower_val])
-                        else:
-                            # Fallback: split roughly (e.g., "John's" -> "John", "'s")
-                            # This mimics simple rule-based splitting
-                            if "'s" in value:
-                                base, suffix = value.rsplit("'s", 1)
-                                tokens.extend([base, "'s"])
-                            elif "n't" in value:
-                                base, suffix = value.rsplit("n't", 1)
-                                tokens.extend([base, "not"])
-                            else:
-                                tokens.append(value)
-                                
+                        self.expand_contraction(value, tokens)
                     else:
                         # For Abbreviations, Hyphenated, Words, and Symbols
                         tokens.append(value)
@@ -85,7 +145,182 @@ class ManualTokenizer:
                 
         return tokens
 
+class TokenSpans:
+    """
+    Array-backed token stream pointing into the original text.
+
+    starts/ends are array('I') offsets and types is an array('B') of indices
+    into tokenizer.token_types. Strings are only built when asked for.
+    """
+    def __init__(self, tokenizer, text, starts, ends, types):
+        self.tokenizer = tokenizer
+        self.text = text
+        self.starts = starts
+        self.ends = ends
+        self.types = types
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, i):
+        # Raw surface form of span i (contractions are not expanded here)
+        return self.text[self.starts[i]:self.ends[i]]
+
+    def type_of(self, i):
+        return self.tokenizer.token_types[self.types[i]]
+
+    def select(self, *token_types):
+        """Return a new TokenSpans keeping only spans of the given types."""
+        wanted = {self.tokenizer.token_types.index(t) for t in token_types}
+        starts = array(self.starts.typecode)
+        ends = array(self.ends.typecode)
+        types = array('B')
+        for start, end, code in zip(self.starts, self.ends, self.types):
+            if code in wanted:
+                starts.append(start)
+                ends.append(end)
+                types.append(code)
+        return TokenSpans(self.tokenizer, self.text, starts, ends, types)
+
+    def tokens(self):
+        """Materialise the same list of strings that tokenize() returns."""
+        contraction = self.tokenizer.token_types.index('CONTRACTION')
+        text = self.text
+        tokens = []
+        for start, end, code in zip(self.starts, self.ends, self.types):
+            if code == contraction:
+                self.tokenizer.expand_contraction(text[start:end], tokens)
+            else:
+                tokens.append(text[start:end])
+        return tokens
+
+    def to_numpy(self):
+        """Zero-copy NumPy views of (starts, ends, types)."""
+        import numpy as np
+        offset_dtype = np.uint32 if self.starts.itemsize == 4 else np.uint64
+        return (np.frombuffer(self.starts, dtype=offset_dtype),
+                np.frombuffer(self.ends, dtype=offset_dtype),
+                np.frombuffer(self.types, dtype=np.uint8))
+
+# Last whitespace character of a string (followed only by non-whitespace)
+LAST_WHITESPACE = re.compile(r'\s(?=\S*\Z)')
+
+def iter_tokenize(source, chunk_size=65536, tokenize=None):
+    """
+    Lazily tokenize a text-mode file object or an iterable of strings.
+
+    No token rule can match across whitespace, so the buffer is only ever cut
+    right after its last whitespace character; the unfinished tail (e.g. 'U.S'
+    or 'ice-') is carried over into the next chunk. The output is identical to
+    calling tokenize() on the whole text, while memory stays bounded by
+    chunk_size plus the longest run of non-whitespace characters.
+
+    Any function with the tokenize(text) -> list signature can be plugged in,
+    such as the notebook tokenizer from Tokenizer.ipynb.
+    """
+    if tokenize is None:
+        tokenize = ManualTokenizer().tokenize
+
+    # 1. Normalise the source into a stream of text pieces
+    if isinstance(source, str):
+        pieces = [source]
+    elif hasattr(source, 'read'):
+        pieces = iter(lambda: source.read(chunk_size), '')
+    else:
+        pieces = source
+
+    # The unfinished tail is kept as a list of pieces, so a long run without
+    # whitespace is joined once instead of being re-copied on every chunk
+    carry = []
+    for piece in pieces:
+        # 2. Find the last whitespace of the new piece only; the carried tail
+        #    is known to contain none
+        match = LAST_WHITESPACE.search(piece)
+        if match is None:
+            # No safe cut point yet, keep accumulating
+            carry.append(piece)
+            continue
+
+        cut = match.start() + 1
+        carry.append(piece[:cut])
+        yield from tokenize(''.join(carry))
+        carry = [piece[cut:]] if cut < len(piece) else []
+
+    # 3. Flush whatever is left once the input is exhausted
+    if carry:
+        yield from tokenize(''.join(carry))
+
+# Per-process tokenizer, built once by the pool initializer
+_worker_tokenizer = None
+
+def _init_worker():
+    global _worker_tokenizer
+    _worker_tokenizer = ManualTokenizer()
+
+def _tokenize_in_worker(doc):
+    return _worker_tokenizer.tokenize(doc)
+
+def tokenize_many(docs, workers=None, chunksize=256, min_parallel=2000):
+    """
+    Tokenize a batch of documents, returning one token list per document in
+    input order.
+
+    Work is spread over a process pool whose initializer compiles the rules
+    once per worker. Batches smaller than min_parallel (or workers=1) are
+    tokenized serially, since pool start-up and pickling cost more than
+    they save there.
+    """
+    docs = list(docs)
+
+    if workers == 1 or len(docs) < min_parallel:
+        tokenizer = ManualTokenizer()
+        return [tokenizer.tokenize(doc) for doc in docs]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        # map() yields results in submission order regardless of completion order
+        return list(pool.map(_tokenize_in_worker, docs, chunksize=chunksize))
+
+def benchmark_tokenize_many(n_docs=200000, worker_counts=(1, 2, 4, 8)):
+    """Docs/sec of tokenize_many for different worker counts."""
+    docs = [f"Doc {i}: It's a sunny day in the U.S.A. and he isn't going to the ice-cream shop."
+            for i in range(n_docs)]
+
+    print(f"--- Scaling benchmark ({n_docs:,} documents, {os.cpu_count()} CPUs) ---")
+    baseline = None
+    for workers in worker_counts:
+        start = time.perf_counter()
+        results = tokenize_many(docs, workers=workers, min_parallel=0)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"workers={workers:<3} {elapsed:8.3f}s  {n_docs / elapsed:>10,.0f} docs/sec  "
+              f"speedup x{baseline / elapsed:.2f}")
+    assert len(results) == n_docs
+
+def benchmark_tokenizer(repeat=2000):
+    """Compare tokens/sec of the single-pass scanner against the rule-wise loop."""
+    tokenizer = ManualTokenizer()
+    text = ("It's a sunny day in the U.S.A. I love ice-cream! He isn't going. "
+            "They're reading state-of-the-art papers, aren't they? ") * repeat
+
+    print(f"--- Benchmark ({len(text):,} characters) ---")
+    results = {}
+    for name, engine in [('rulewise', tokenizer.tokenize_rulewise),
+                         ('scanner', tokenizer.tokenize)]:
+        start = time.perf_counter()
+        tokens = engine(text)
+        elapsed = time.perf_counter() - start
+        results[name] = tokens
+        print(f"{name:<10} {len(tokens):>9,} tokens  {elapsed:8.4f}s  "
+              f"{len(tokens) / elapsed:>12,.0f} tokens/sec")
+
+    print(f"Identical output? {'Yes' if results['rulewise'] == results['scanner'] else 'No'}")
+
 if __name__ == "__main__":
+    if '--benchmark' in sys.argv:
+        benchmark_tokenizer()
+        benchmark_tokenize_many()
+        sys.exit()
+
     # Test Data
     input_text = "It's a sunny day in the U.S.A. I love ice-cream! He isn't going."
     
@@ -104,4 +339,13 @@ if __name__ == "__main__":
     print(f"1. Contraction 'It's' split? {'Yes' if 'it' in tokens and 'is' in tokens else 'No'}")
     print(f"2. Abbreviation 'U.S.A.' kept? {'Yes' if 'U.S.A.' in tokens else 'No'}")
     print(f"3. Hyphenation 'ice-cream' kept? {'Yes' if 'ice-cream' in tokens else 'No'}")
-    print(f"4. Symbols '!' and '.' separate? {'Yes' if '!' in tokens and '.' in tokens else 'No'}")
\ No newline at end of file
+    print(f"4. Symbols '!' and '.' separate? {'Yes' if '!' in tokens and '.' in tokens else 'No'}")
+
+    # Streaming: feed the same text in tiny chunks that cut through 'U.S.A.' and 'ice-cream'
+    streamed = list(tokenizer.iter_tokenize(io.StringIO(input_text), chunk_size=7))
+    print(f"5. Streaming output identical? {'Yes' if streamed == tokens else 'No'}")
+
+    # Compact spans: offsets + type codes, strings built only on demand
+    spans = tokenizer.tokenize_spans(input_text)
+    print(f"6. Span output identical? {'Yes' if spans.tokens() == tokens else 'No'}")
+    print(f"   Hyphenated spans: {spans.select('HYPHENATED').tokens()}")
\ No newline at end of file
@@ -1,3 +1,18 @@
+import heapq
+import mmap
+import os
+import random
+import re
+import shutil
+import string
+import struct
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from collections.abc import Mapping
+from functools import lru_cache
+
 def get_channel_probability(candidate, misspelled):
     """
     Calculates P(s|w): The probability of the misspelling 's' given the word 'w'.
@@ -30,6 +45,425 @@ def get_channel_probability(candidate, misspelled):
          
     return 0.000001 # Default low prob for other cases
 
+def edit_distance(a, b, max_distance=None):
+    """
+    Damerau-Levenshtein distance in its optimal string alignment form
+    (insert, delete, substitute, adjacent swap).
+
+    With max_distance set, gives up as soon as a whole DP row exceeds it
+    (no later row can come back under the bound) and returns max_distance + 1.
+    """
+    if max_distance is not None and abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1,         # deletion
+                             current[j - 1] + 1,      # insertion
+                             previous[j - 1] + cost)  # substitution
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)  # transposition
+        if max_distance is not None and min(current) > max_distance:
+            return max_distance + 1
+        previous2, previous = previous, current
+
+    if max_distance is not None and previous[len(b)] > max_distance:
+        return max_distance + 1
+    return previous[len(b)]
+
+def get_edit_channel_probability(distance):
+    """
+    P(s|w) from the Damerau-Levenshtein distance, on the same scale as
+    get_channel_probability: 1.0 for no error, 0.001 per edit.
+    """
+    return 0.001 ** distance
+
+def delete_variants(word, max_distance):
+    """All strings reachable from word by deleting up to max_distance characters."""
+    variants = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        variants |= frontier
+    return variants
+
+def correct_linear(misspelled, dictionary):
+    """Original O(|V|) approach: score every dictionary word by P(w) * P(s|w)."""
+    best_candidate = None
+    highest_score = -1
+    for word, prior_prob in dictionary.items():
+        score = prior_prob * get_channel_probability(word, misspelled)
+        if score > highest_score:
+            highest_score = score
+            best_candidate = word
+    return best_candidate, highest_score
+
+class IndexedCorrector:
+    """
+    Noisy-channel corrector backed by a SymSpell-style deletion index.
+
+    Every dictionary word is indexed under all strings obtained by deleting
+    up to max_distance characters from its first prefix_length characters.
+    A query generates its own deletes the same way, so only words sharing a
+    delete variant are fetched; those are then checked with a bounded
+    edit_distance() and the survivors are scored with P(w) * P(s|w), where
+    the channel probability comes from that Damerau-Levenshtein distance.
+    """
+    def __init__(self, dictionary, max_distance=2, prefix_length=7, cache_size=100000, deletes=None):
+        self.dictionary = dictionary
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+
+        # Corrections memoized per misspelling for correct_many()
+        self._correct_cached = lru_cache(maxsize=cache_size)(self.correct)
+
+        # A prebuilt index (e.g. MmapDeleteIndex) only needs .get(variant, default)
+        if deletes is None:
+            deletes = defaultdict(list)
+            for word in dictionary:
+                for variant in delete_variants(word[:prefix_length], max_distance):
+                    deletes[variant].append(word)
+        self.deletes = deletes
+
+    def candidates_with_distance(self, misspelled):
+        """(word, distance) for dictionary words within max_distance edits of misspelled."""
+        found = set()
+        for variant in delete_variants(misspelled[:self.prefix_length], self.max_distance):
+            found.update(self.deletes.get(variant, ()))
+
+        result = []
+        for word in found:
+            distance = edit_distance(word, misspelled, self.max_distance)
+            if distance <= self.max_distance:
+                result.append((word, distance))
+        return result
+
+    def candidates(self, misspelled):
+        """Dictionary words within max_distance edits of misspelled."""
+        return [word for word, _ in self.candidates_with_distance(misspelled)]
+
+    def correct(self, misspelled):
+        """Best candidate and its score, or (None, 0.0) if nothing is within range."""
+        best_candidate = None
+        highest_score = 0.0
+        for word, distance in self.candidates_with_distance(misspelled):
+            score = self.dictionary[word] * get_edit_channel_probability(distance)
+            if score > highest_score:
+                highest_score = score
+                best_candidate = word
+        return best_candidate, highest_score
+
+    def correct_many(self, tokens):
+        """
+        Correct a whole token list. Each distinct token is corrected once and
+        results are kept in an LRU cache across calls, so a document costs
+        about one correction per distinct unknown word. Tokens with no
+        candidate in range are returned unchanged.
+        """
+        corrections = {}
+        for token in tokens:
+            if token not in corrections:
+                best_candidate, _ = self._correct_cached(token)
+                corrections[token] = best_candidate if best_candidate is not None else token
+        return [corrections[token] for token in tokens]
+
+    def cache_info(self):
+        return self._correct_cached.cache_info()
+
+    @classmethod
+    def from_lexicon(cls, path, cache_size=100000):
+        """
+        Corrector over a memory-mapped lexicon file: both the priors and the
+        delete index written by build_lexicon are read through the mmap, so
+        nothing is decoded or rebuilt at startup.
+        """
+        lexicon = MmapLexicon(path)
+        return cls(lexicon, lexicon.max_distance, lexicon.prefix_length, cache_size,
+                   deletes=MmapDeleteIndex(lexicon))
+
+# Corpus-derived priors
+# Lexicon file layout (little-endian):
+#   header: magic b'LEX2' | n_words u64 | total_count u64 | max_distance u64
+#           | prefix_length u64 | n_keys u64 | n_postings u64
+#   word_offsets    (n_words + 1) x u64   byte offsets of each word in the word blob
+#   counts          n_words x u64
+#   key_offsets     (n_keys + 1) x u64    byte offsets of each delete key in the key blob
+#   posting_offsets (n_keys + 1) x u64    start of each key's word ids in postings
+#   postings        n_postings x u32      word ids, ascending per key
+#   word blob                             UTF-8 words, sorted, concatenated
+#   key blob                              UTF-8 delete keys, sorted, concatenated
+LEXICON_MAGIC = b'LEX2'
+LEXICON_HEADER = struct.Struct('<4sQQQQQQ')
+WORD_PATTERN = re.compile(r"[a-z]+")
+
+def _flush_shard(counts, shard_dir):
+    """Write counts as a sorted 'word<TAB>count' text shard and return its path."""
+    fd, path = tempfile.mkstemp(suffix='.shard', dir=shard_dir)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        for word in sorted(counts):
+            f.write(f"{word}\t{counts[word]}\n")
+    return path
+
+def _read_shard(path):
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            word, count = line.rstrip('\n').split('\t')
+            yield word, int(count)
+
+def _flush_postings(postings, shard_dir):
+    """Write (delete key, word id) pairs as a sorted 'key<TAB>id' text shard and return its path."""
+    fd, path = tempfile.mkstemp(suffix='.shard', dir=shard_dir)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        for key, word_id in sorted(postings):
+            f.write(f"{key}\t{word_id}\n")
+    return path
+
+def _with_sentinel(pairs):
+    """Yield pairs followed by a (None, 0) sentinel so the last group is flushed."""
+    yield from pairs
+    yield None, 0
+
+def build_lexicon(lines, out_path, max_types_in_memory=500000, min_count=1, shard_dir=None,
+                  max_distance=2, prefix_length=7):
+    """
+    Count word frequencies over an iterable of text lines (e.g. an open file)
+    and write a sorted lexicon file for MmapLexicon, including the
+    IndexedCorrector delete index (delete key -> word ids) for the given
+    max_distance and prefix_length.
+
+    Counts are kept in memory for at most max_types_in_memory distinct words
+    (and as many delete postings); beyond that the table is flushed to a
+    sorted shard on disk. The shards are k-way merged at the end, so memory
+    stays bounded however large the corpus is. Returns the number of words written.
+    """
+    shard_dir = tempfile.mkdtemp(dir=shard_dir)
+    shards, posting_shards = [], []
+    try:
+        # 1. Count, spilling sorted shards when the table gets too big
+        counts = Counter()
+        for line in lines:
+            counts.update(WORD_PATTERN.findall(line.lower()))
+            if len(counts) >= max_types_in_memory:
+                shards.append(_flush_shard(counts, shard_dir))
+                counts.clear()
+        if counts:
+            shards.append(_flush_shard(counts, shard_dir))
+        del counts
+
+        # 2. Merge shards; offsets, counts and the word blob are streamed to
+        #    side files because their sizes are only known at the end. Every
+        #    word's delete variants are spilled to posting shards on the way.
+        part_names = ('word_offsets', 'counts', 'key_offsets', 'posting_offsets', 'postings',
+                      'word_blob', 'key_blob')
+        part_paths = {name: os.path.join(shard_dir, name) for name in part_names}
+        n_words = total = offset = 0
+        postings = []
+        with open(part_paths['word_offsets'], 'wb') as offsets_f, \
+                open(part_paths['counts'], 'wb') as counts_f, \
+                open(part_paths['word_blob'], 'wb') as blob_f:
+            offsets_f.write(struct.pack('<Q', 0))
+            merged = heapq.merge(*(_read_shard(path) for path in shards))
+            current, current_count = None, 0
+            for word, count in _with_sentinel(merged):
+                if word == current:
+                    current_count += count
+                    continue
+                if current is not None and current_count >= min_count:
+                    encoded = current.encode('utf-8')
+                    blob_f.write(encoded)
+                    offset += len(encoded)
+                    offsets_f.write(struct.pack('<Q', offset))
+                    counts_f.write(struct.pack('<Q', current_count))
+                    postings.extend((variant, n_words)
+                                    for variant in delete_variants(current[:prefix_length], max_distance))
+                    if len(postings) >= max_types_in_memory:
+                        posting_shards.append(_flush_postings(postings, shard_dir))
+                        postings.clear()
+                    n_words += 1
+                    total += current_count
+                current, current_count = word, count
+        if postings:
+            posting_shards.append(_flush_postings(postings, shard_dir))
+        del postings
+
+        # 3. Merge posting shards into sorted keys with their word id lists
+        n_keys = n_postings = key_offset = 0
+        with open(part_paths['key_offsets'], 'wb') as key_offsets_f, \
+                open(part_paths['posting_offsets'], 'wb') as posting_offsets_f, \
+                open(part_paths['postings'], 'wb') as postings_f, \
+                open(part_paths['key_blob'], 'wb') as key_blob_f:
+            key_offsets_f.write(struct.pack('<Q', 0))
+            posting_offsets_f.write(struct.pack('<Q', 0))
+            merged = heapq.merge(*(_read_shard(path) for path in posting_shards))
+            current = None
+            for key, word_id in _with_sentinel(merged):
+                if key != current and current is not None:
+                    encoded = current.encode('utf-8')
+                    key_blob_f.write(encoded)
+                    key_offset += len(encoded)
+                    key_offsets_f.write(struct.pack('<Q', key_offset))
+                    posting_offsets_f.write(struct.pack('<Q', n_postings))
+                    n_keys += 1
+                if key is not None:
+                    postings_f.write(struct.pack('<I', word_id))
+                    n_postings += 1
+                current = key
+
+        # 4. Assemble header + parts into the final file
+        with open(out_path, 'wb') as out:
+            out.write(LEXICON_HEADER.pack(LEXICON_MAGIC, n_words, total, max_distance,
+                                          prefix_length, n_keys, n_postings))
+            for name in part_names:
+                with open(part_paths[name], 'rb') as f:
+                    shutil.copyfileobj(f, out)
+        return n_words
+    finally:
+        shutil.rmtree(shard_dir, ignore_errors=True)
+
+def _search_blob(blob, offsets, n, key):
+    """Index of key in a sorted blob/offsets table, or -1."""
+    lo, hi = 0, n
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if blob[offsets[mid]:offsets[mid + 1]].tobytes() < key:
+            lo = mid + 1
+        else:
+            hi = mid
+    if lo < n and blob[offsets[lo]:offsets[lo + 1]] == key:
+        return lo
+    return -1
+
+class MmapLexicon(Mapping):
+    """
+    Read-only word -> P(w) mapping over a lexicon file written by build_lexicon.
+
+    The file is memory-mapped and nothing is parsed at load time: lookups
+    binary-search the sorted word blob directly. Processes that open the
+    same file share one page-cache copy of the priors.
+    """
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, self._n, self.total_count, self.max_distance, self.prefix_length,
+         self._n_keys, n_postings) = LEXICON_HEADER.unpack_from(self._mm, 0)
+        if magic != LEXICON_MAGIC:
+            raise ValueError(f"{path} is not a lexicon file")
+
+        view = memoryview(self._mm)
+        start = LEXICON_HEADER.size
+        sections = []
+        for size, fmt in [(self._n + 1, 'Q'), (self._n, 'Q'), (self._n_keys + 1, 'Q'),
+                          (self._n_keys + 1, 'Q'), (n_postings, 'I')]:
+            width = struct.calcsize(fmt)
+            sections.append(view[start:start + width * size].cast(fmt))
+            start += width * size
+        self._offsets, self._counts, self._key_offsets, self._posting_offsets, self._postings = sections
+        self._blob = view[start:start + self._offsets[self._n]]
+        self._key_blob = view[start + self._offsets[self._n]:]
+
+    def _word_bytes(self, i):
+        return self._blob[self._offsets[i]:self._offsets[i + 1]]
+
+    def _find(self, word):
+        return _search_blob(self._blob, self._offsets, self._n, word.encode('utf-8'))
+
+    def word(self, i):
+        return bytes(self._word_bytes(i)).decode('utf-8')
+
+    def delete_postings(self, variant):
+        """Ids of the words indexed under a delete variant (empty if none)."""
+        i = _search_blob(self._key_blob, self._key_offsets, self._n_keys, variant.encode('utf-8'))
+        if i < 0:
+            return ()
+        return self._postings[self._posting_offsets[i]:self._posting_offsets[i + 1]]
+
+    def count(self, word):
+        i = self._find(word)
+        return self._counts[i] if i >= 0 else 0
+
+    def __getitem__(self, word):
+        i = self._find(word)
+        if i < 0:
+            raise KeyError(word)
+        return self._counts[i] / self.total_count
+
+    def __contains__(self, word):
+        return self._find(word) >= 0
+
+    def __len__(self):
+        return self._n
+
+    def __iter__(self):
+        for i in range(self._n):
+            yield self.word(i)
+
+class MmapDeleteIndex:
+    """The delete index of an MmapLexicon, with the dict.get() interface IndexedCorrector uses."""
+    def __init__(self, lexicon):
+        self.lexicon = lexicon
+
+    def get(self, variant, default=()):
+        ids = self.lexicon.delete_postings(variant)
+        return [self.lexicon.word(i) for i in ids] if len(ids) else default
+
+    def __len__(self):
+        return self.lexicon._n_keys
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+def benchmark_correctors(vocab_size=200000, n_queries=200, seed=0):
+    """Query latency (p50/p99) of the deletion index against the linear scan."""
+    rng = random.Random(seed)
+
+    # Synthetic lexicon with Zipf-like priors
+    words = set()
+    while len(words) < vocab_size:
+        words.add(''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10))))
+    words = sorted(words)
+    total = sum(1 / rank for rank in range(1, vocab_size + 1))
+    dictionary = {word: (1 / rank) / total for rank, word in enumerate(words, start=1)}
+
+    # Queries: dictionary words with one random substitution
+    queries = []
+    for word in rng.sample(words, n_queries):
+        i = rng.randrange(len(word))
+        queries.append(word[:i] + rng.choice(string.ascii_lowercase) + word[i + 1:])
+
+    start = time.perf_counter()
+    corrector = IndexedCorrector(dictionary)
+    print(f"--- Corrector benchmark (|V| = {vocab_size:,}, {n_queries} queries) ---")
+    print(f"Index build: {time.perf_counter() - start:.2f}s, {len(corrector.deletes):,} delete keys")
+
+    for name, correct in [('linear scan', lambda q: correct_linear(q, dictionary)),
+                          ('deletion index', corrector.correct)]:
+        latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            correct(query)
+            latencies.append(time.perf_counter() - start)
+        latencies.sort()
+        print(f"{name:<15} p50 {percentile(latencies, 0.50) * 1000:9.3f} ms   "
+              f"p99 {percentile(latencies, 0.99) * 1000:9.3f} ms")
+
+    # A "document": Zipf-distributed repeats of the misspellings
+    document = rng.choices(queries, weights=[1 / rank for rank in range(1, n_queries + 1)], k=20000)
+
+    start = time.perf_counter()
+    per_occurrence = [corrector.correct(token)[0] or token for token in document[:2000]]
+    elapsed = (time.perf_counter() - start) * len(document) / 2000
+    print(f"per-occurrence  {elapsed:9.3f} s for {len(document):,} tokens (extrapolated from 2,000)")
+
+    start = time.perf_counter()
+    batched = corrector.correct_many(document)
+    print(f"correct_many    {time.perf_counter() - start:9.3f} s for {len(document):,} tokens")
+    print(f"Same corrections? {'Yes' if batched[:2000] == per_occurrence else 'No'}")
+
 def spelling_corrector():
     # 1. Corpus and Dictionary (V) with Prior Probabilities P(w)
     # We assume 'word' is more common than 'weird' or 'ward'
@@ -76,5 +510,24 @@ def spelling_corrector():
     print("-" * 60)
     print(f"Best Correction: '{best_candidate}' with score {highest_score:.7f}")
 
+    # 5. Same scoring, but only over candidates fetched from the deletion index
+    corrector = IndexedCorrector(dictionary_V)
+    print(f"Indexed candidates: {sorted(corrector.candidates(misspelled_word))}")
+    print(f"Indexed Correction: {corrector.correct(misspelled_word)}")
+    print(f"Batch Correction: {corrector.correct_many(['wrod', 'wrok', 'wrod', 'wordl'])}")
+
 if __name__ == "__main__":
+    if '--benchmark' in sys.argv:
+        benchmark_correctors()
+        sys.exit()
+
+    if '--build-lexicon' in sys.argv:
+        # python question4.py --build-lexicon corpus.txt lexicon.bin
+        i = sys.argv.index('--build-lexicon')
+        corpus_path, lexicon_path = sys.argv[i + 1:i + 3]
+        with open(corpus_path, encoding='utf-8', errors='replace') as corpus:
+            n_words = build_lexicon(corpus, lexicon_path)
+        print(f"Wrote {n_words:,} words to {lexicon_path}")
+        sys.exit()
+
     spelling_corrector()
\ No newline at end of file
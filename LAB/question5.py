@@ -1,42 +1,82 @@
+import json
 import math
-from collections import defaultdict
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import numpy as np
+from scipy import sparse
 
 class NaiveBayesClassifier:
     def __init__(self):
+        # Labels are discovered from the training data (e.g. Positive/Negative)
         self.vocab = set()
-        self.word_counts = {'Positive': defaultdict(int), 'Negative': defaultdict(int)}
-        self.class_counts = {'Positive': 0, 'Negative': 0}
+        self.word_counts = {}
+        self.class_counts = {}
         self.priors = {}
-        self.total_words_in_class = {'Positive': 0, 'Negative': 0}
+        self.total_words_in_class = {}
+        self.total_docs = 0
+
+        # Filled in by compile() and kept up to date by partial_fit()
+        self.compiled = None
 
     def preprocess(self, text):
         # Simple tokenization: Lowercase and split by space
         return text.lower().split()
 
+    def add_label(self, label):
+        self.word_counts[label] = defaultdict(int)
+        self.class_counts[label] = 0
+        self.total_words_in_class[label] = 0
+
     def train(self, data):
-        total_docs = len(data)
-        
+        # Counts accumulate across calls, so train() and partial_fit() are the same
+        self.partial_fit(data)
+
+    def partial_fit(self, stream):
+        """
+        Update the model from an iterable of (text, label) pairs. Labels not
+        seen before are added. Counts and priors accumulate over all data seen
+        so far, and a compiled model is patched in place: only the
+        (label, word) cells touched by the new data are recomputed.
+        """
+        touched = set()
+
         # 1. Calculate Counts
-        for text, label in data:
+        for text, label in stream:
+            if label not in self.class_counts:
+                self.add_label(label)
             self.class_counts[label] += 1
+            self.total_docs += 1
             words = self.preprocess(text)
             
             for word in words:
                 self.vocab.add(word)
                 self.word_counts[label][word] += 1
                 self.total_words_in_class[label] += 1
+                touched.add((label, word))
         
         # 2. Calculate Priors: P(Class)
         # Formula: P(c) = N_c / N_total
         for label in self.class_counts:
-            self.priors[label] = self.class_counts[label] / total_docs
+            self.priors[label] = self.class_counts[label] / self.total_docs
+
+        if self.compiled is not None:
+            self.update_compiled(touched)
 
     def get_word_probability(self, word, label):
         # 3. Calculate Likelihood: P(word | Class)
         # Using Laplace Smoothing (Add-1) to handle unknown words
         # Formula: (Count(w, c) + 1) / (Count(all_words_in_c) + |Vocabulary|)
         
-        count_w_c = self.word_counts[label][word]
+        # .get() so that looking up an unseen word does not add it to the model
+        count_w_c = self.word_counts[label].get(word, 0)
         count_c = self.total_words_in_class[label]
         vocab_size = len(self.vocab)
         
@@ -47,7 +87,7 @@ class NaiveBayesClassifier:
         scores = {}
 
         # 4. Apply Bayes Theorem: P(c|d) ∝ P(c) * Π P(w_i|c)
-        # We compute score for both Positive and Negative
+        # We compute a score for every label
         for label in self.class_counts:
             # Start with Prior P(c)
             # We use Log Probability to prevent underflow (multiplying tiny numbers)
@@ -63,7 +103,393 @@ class NaiveBayesClassifier:
         # Return class with highest score (Argmax)
         return max(scores, key=scores.get)
 
+    def merge_counts(self, table):
+        """
+        Add a count table from count_shard() into the model. Merging the
+        tables of consecutive shards in order gives exactly the model that
+        serial training on the concatenated data gives.
+        """
+        class_counts, total_words_in_class, word_counts = table
+        touched = set()
+
+        for label, n_docs in class_counts.items():
+            if label not in self.class_counts:
+                self.add_label(label)
+            self.class_counts[label] += n_docs
+            self.total_docs += n_docs
+            self.total_words_in_class[label] += total_words_in_class[label]
+
+            counts = self.word_counts[label]
+            for word, count in word_counts[label].items():
+                counts[word] += count
+                touched.add((label, word))
+            self.vocab.update(word_counts[label])
+
+        for label in self.class_counts:
+            self.priors[label] = self.class_counts[label] / self.total_docs
+
+        if self.compiled is not None:
+            self.update_compiled(touched)
+
+    def train_sharded(self, data, workers=None, shard_size=50000):
+        """
+        Map-reduce training over an iterable of (text, label) pairs: the input
+        is cut into shards of shard_size documents, worker processes count
+        each shard, and the count tables are merged here in shard order.
+        At most two shards per worker are in flight, so the input is never
+        fully materialized.
+        """
+        data = iter(data)
+        shards = iter(lambda: list(islice(data, shard_size)), [])
+        self._merge_from_pool(count_shard, shards, workers)
+
+    def train_files(self, paths, workers=None):
+        """
+        Same as train_sharded(), with one shard per file. Each line of a file
+        is 'label<TAB>text'; workers read their files themselves.
+        """
+        self._merge_from_pool(count_file, paths, workers)
+
+    def _merge_from_pool(self, count_function, shards, workers):
+        workers = workers or os.cpu_count()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for shard in shards:
+                pending.append(pool.submit(count_function, shard))
+                if len(pending) >= 2 * workers:
+                    self.merge_counts(pending.popleft().result())
+            while pending:
+                self.merge_counts(pending.popleft().result())
+
+    def compile(self):
+        """
+        Precompute everything predict() recomputes per word:
+        - labels: label order used by the arrays below
+        - vocab_index: word -> column; column 0 stands for unknown words
+        - log_counts: (labels x columns) matrix of log(Count(w, c) + 1), with
+          spare columns so that new words can be appended cheaply
+        - log_denominators: log(Count(all_words_in_c) + |Vocabulary|)
+        - log_priors: log P(label)
+
+        log P(w | c) = log_counts[c, w] - log_denominators[c]; keeping the
+        two parts apart means a vocabulary change only touches the
+        denominators, not every cell of the matrix.
+        """
+        labels = list(self.class_counts)
+        vocab_index = {word: i for i, word in enumerate(sorted(self.vocab), start=1)}
+        n_columns = len(vocab_index) + 1
+
+        log_counts = np.zeros((len(labels), n_columns), dtype=np.float64)
+        for row, label in enumerate(labels):
+            for word, count in self.word_counts[label].items():
+                log_counts[row, vocab_index[word]] = math.log(count + 1)
+
+        self.compiled = {
+            'labels': labels,
+            'label_index': {label: row for row, label in enumerate(labels)},
+            'vocab_index': vocab_index,
+            'log_counts': log_counts,
+        }
+        self.update_denominators_and_priors()
+        return self.compiled
+
+    def update_denominators_and_priors(self):
+        # Same Laplace smoothing as get_word_probability()
+        labels = self.compiled['labels']
+        vocab_size = len(self.vocab)
+        self.compiled['log_denominators'] = np.log(
+            [self.total_words_in_class[label] + vocab_size for label in labels])
+        self.compiled['log_priors'] = np.log([self.priors[label] for label in labels])
+
+    def update_compiled(self, touched):
+        """Patch the compiled model for the (label, word) pairs in touched."""
+        compiled = self.compiled
+        label_index = compiled['label_index']
+        vocab_index = compiled['vocab_index']
+        log_counts = compiled['log_counts']
+
+        # 1. New labels get a fresh row; new words the next free column
+        for label in self.class_counts:
+            if label not in label_index:
+                label_index[label] = len(compiled['labels'])
+                compiled['labels'].append(label)
+        for _, word in touched:
+            if word not in vocab_index:
+                vocab_index[word] = len(vocab_index) + 1
+
+        rows, columns = len(compiled['labels']), len(vocab_index) + 1
+        if rows > log_counts.shape[0] or columns > log_counts.shape[1]:
+            # Grow columns geometrically so repeated small updates stay cheap
+            capacity = log_counts.shape[1]
+            if columns > capacity:
+                capacity = max(columns, 2 * capacity)
+            grown = np.zeros((rows, capacity), dtype=np.float64)
+            grown[:log_counts.shape[0], :log_counts.shape[1]] = log_counts
+            log_counts = compiled['log_counts'] = grown
+
+        # 2. Recompute only the touched cells
+        if touched:
+            touched = list(touched)
+            row_ids = [label_index[label] for label, _ in touched]
+            column_ids = [vocab_index[word] for _, word in touched]
+            log_counts[row_ids, column_ids] = np.log1p(
+                [self.word_counts[label][word] for label, word in touched])
+
+        # 3. Per-label terms (one value per label)
+        self.update_denominators_and_priors()
+
+    def vectorize(self, texts):
+        """Sparse (documents x columns) count matrix; unknown words go to column 0."""
+        vocab_index = self.compiled['vocab_index']
+
+        indices = []
+        indptr = [0]
+        for text in texts:
+            indices.extend(vocab_index.get(word, 0) for word in self.preprocess(text))
+            indptr.append(len(indices))
+
+        data = np.ones(len(indices), dtype=np.float64)
+        # Duplicate (row, column) entries are summed into word counts
+        return sparse.csr_matrix((data, indices, indptr), shape=(len(texts), len(vocab_index) + 1))
+
+    def predict_batch(self, texts):
+        """Predict labels for a list of texts with one sparse matrix product."""
+        if self.compiled is None:
+            self.compile()
+
+        compiled = self.compiled
+        counts = self.vectorize(list(texts))
+        n_columns = counts.shape[1]
+        lengths = np.asarray(counts.sum(axis=1)).ravel()
+
+        # score = log P(c) + sum_w n_w * (log_counts[c, w] - log_denominators[c])
+        scores = (counts @ compiled['log_counts'][:, :n_columns].T
+                  - lengths[:, None] * compiled['log_denominators']
+                  + compiled['log_priors'])
+        labels = compiled['labels']
+        return [labels[i] for i in np.asarray(scores).argmax(axis=1)]
+
+    def save(self, path):
+        """
+        Write the model in the binary format read by MmapNaiveBayes
+        (all little-endian, arrays 8-byte aligned):
+          header      magic b'NBM1' | n_labels u32 | n_words u64 | labels_size u64
+          labels      JSON list of label names, UTF-8
+          log_priors  float32[n_labels]
+          log_probs   float32[n_labels, n_words + 1]  log P(w | c); column 0 = unknown word
+          offsets     uint64[n_words + 1]             byte offsets into the word blob
+          words       sorted UTF-8 vocabulary, concatenated
+        """
+        compiled = self.compile()
+        words = sorted(compiled['vocab_index'], key=lambda word: word.encode('utf-8'))
+        columns = [0] + [compiled['vocab_index'][word] for word in words]
+        log_probs = (compiled['log_counts'][:, columns]
+                     - compiled['log_denominators'][:, None]).astype('<f4')
+
+        encoded = [word.encode('utf-8') for word in words]
+        offsets = np.zeros(len(encoded) + 1, dtype='<u8')
+        np.cumsum([len(word) for word in encoded], out=offsets[1:])
+        labels = json.dumps(compiled['labels']).encode('utf-8')
+
+        with open(path, 'wb') as f:
+            f.write(MODEL_HEADER.pack(MODEL_MAGIC, len(compiled['labels']), len(words), len(labels)))
+            f.write(labels)
+            for array in (compiled['log_priors'].astype('<f4'), log_probs, offsets):
+                f.write(b'\0' * (-f.tell() % 8))
+                f.write(array.tobytes())
+            f.write(b''.join(encoded))
+
+    @staticmethod
+    def load(path, mmap=True):
+        """Load a saved model for serving (see MmapNaiveBayes)."""
+        return MmapNaiveBayes(path, use_mmap=mmap)
+
+MODEL_MAGIC = b'NBM1'
+MODEL_HEADER = struct.Struct('<4sIQQ')
+
+class MmapNaiveBayes:
+    """
+    Read-only model loaded from NaiveBayesClassifier.save().
+
+    With use_mmap=True the file is memory-mapped and the arrays are NumPy
+    views into it, so loading costs the same for any model size and worker
+    processes that load the same file share one page-cache copy. Words are
+    looked up by binary search over the sorted vocabulary and memoized per
+    process. Scores are computed in float32, so near-ties can resolve
+    differently from the float64 NaiveBayesClassifier.
+    """
+    def __init__(self, path, use_mmap=True):
+        with open(path, 'rb') as f:
+            if use_mmap:
+                self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self._buffer = f.read()
+
+        magic, n_labels, n_words, labels_size = MODEL_HEADER.unpack_from(self._buffer, 0)
+        if magic != MODEL_MAGIC:
+            raise ValueError(f"{path} is not a saved NaiveBayesClassifier")
+
+        position = MODEL_HEADER.size
+        self.labels = json.loads(bytes(self._buffer[position:position + labels_size]))
+        position += labels_size
+
+        def take(dtype, count):
+            nonlocal position
+            position += -position % 8
+            array = np.frombuffer(self._buffer, dtype=dtype, count=count, offset=position)
+            position += array.nbytes
+            return array
+
+        self.log_priors = take('<f4', n_labels)
+        self.log_probs = take('<f4', n_labels * (n_words + 1)).reshape(n_labels, n_words + 1)
+        self._offsets = take('<u8', n_words + 1)
+        self._words_start = position
+        self._n_words = n_words
+        self._columns = {}
+
+    def preprocess(self, text):
+        return text.lower().split()
+
+    def column(self, word):
+        """Column of word in log_probs (0 if unknown)."""
+        column = self._columns.get(word)
+        if column is None:
+            key = word.encode('utf-8')
+            base, offsets, buffer = self._words_start, self._offsets, self._buffer
+            lo, hi = 0, self._n_words
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if buffer[base + int(offsets[mid]):base + int(offsets[mid + 1])] < key:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            found = lo < self._n_words and \
+                buffer[base + int(offsets[lo]):base + int(offsets[lo + 1])] == key
+            column = self._columns[word] = lo + 1 if found else 0
+        return column
+
+    def predict_batch(self, texts):
+        """
+        Predict labels for a list of texts. Only the columns of the words that
+        occur are read, so a mapped model is paged in on demand.
+        """
+        columns = []
+        indptr = [0]
+        for text in texts:
+            columns.extend(self.column(word) for word in self.preprocess(text))
+            indptr.append(len(columns))
+
+        # Per-document sums of the gathered log-probabilities via a running sum
+        gathered = self.log_probs[:, columns].astype(np.float64)
+        running = np.zeros((len(self.labels), len(columns) + 1))
+        np.cumsum(gathered, axis=1, out=running[:, 1:])
+        indptr = np.array(indptr)
+        scores = (running[:, indptr[1:]] - running[:, indptr[:-1]]).T + self.log_priors
+        return [self.labels[i] for i in scores.argmax(axis=1)]
+
+    def predict(self, text):
+        return self.predict_batch([text])[0]
+
+def count_shard(pairs):
+    """
+    Worker side of train_sharded(): count one shard of (text, label) pairs
+    and return (class_counts, total_words_in_class, word_counts) as plain dicts.
+    """
+    model = NaiveBayesClassifier()
+    model.partial_fit(pairs)
+    return (model.class_counts, model.total_words_in_class,
+            {label: dict(counts) for label, counts in model.word_counts.items()})
+
+def read_labelled_file(path):
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            label, text = line.rstrip('\n').split('\t', 1)
+            yield text, label
+
+def count_file(path):
+    """Worker side of train_files(): count one 'label<TAB>text' file."""
+    return count_shard(read_labelled_file(path))
+
+def synthetic_reviews(n_docs, seed=0, words_per_doc=12):
+    """Lazily generate (text, label) pairs; each label favours its own word range."""
+    rng = np.random.default_rng(seed)
+    words = np.array([f"w{i}" for i in range(20000)])
+    ranges = {'Positive': words[:12000], 'Negative': words[8000:]}
+    block = 10000
+    for start in range(0, n_docs, block):
+        size = min(block, n_docs - start)
+        labels = rng.choice(['Positive', 'Negative'], size=size)
+        for label in labels:
+            yield " ".join(rng.choice(ranges[label], size=words_per_doc)), str(label)
+
+def benchmark_training(n_docs=1000000, n_shards=32, worker_counts=(1, 2, 4, 8)):
+    """
+    Training time of serial training against train_files() for several
+    worker counts, on a synthetic corpus written to n_shards files first so
+    that corpus generation is not part of the measurement.
+    """
+    print(f"--- Training benchmark ({n_docs:,} synthetic documents, {os.cpu_count()} CPUs) ---")
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = [os.path.join(directory, f"shard{i:03d}.tsv") for i in range(n_shards)]
+        reviews = synthetic_reviews(n_docs)
+        per_shard = -(-n_docs // n_shards)
+        for path in paths:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.writelines(f"{label}\t{text}\n" for text, label in islice(reviews, per_shard))
+
+        start = time.perf_counter()
+        serial = NaiveBayesClassifier()
+        for path in paths:
+            serial.train(read_labelled_file(path))
+        baseline = time.perf_counter() - start
+        print(f"serial          {baseline:8.2f}s  {n_docs / baseline:>10,.0f} docs/sec")
+
+        for workers in worker_counts:
+            start = time.perf_counter()
+            sharded = NaiveBayesClassifier()
+            sharded.train_files(paths, workers=workers)
+            elapsed = time.perf_counter() - start
+            identical = (sharded.class_counts == serial.class_counts
+                         and sharded.total_words_in_class == serial.total_words_in_class
+                         and sharded.word_counts == serial.word_counts)
+            print(f"workers={workers:<6} {elapsed:8.2f}s  {n_docs / elapsed:>10,.0f} docs/sec  "
+                  f"speedup x{baseline / elapsed:.2f}  identical={identical}")
+
+def benchmark_predict(n_texts=20000):
+    """Texts/sec of predict() in a loop against predict_batch()."""
+    # Synthetic reviews: each label draws from its own, overlapping, word range
+    words = np.array([f"w{i}" for i in range(5000)])
+    ranges = {'Positive': words[:3000], 'Negative': words[2000:]}
+    rng = np.random.default_rng(0)
+
+    def make_text(label):
+        return " ".join(rng.choice(ranges[label], size=12))
+
+    train_data = [(make_text(label), label) for label in ['Positive', 'Negative'] * 2500]
+    nb = NaiveBayesClassifier()
+    nb.train(train_data)
+    texts = [make_text(rng.choice(['Positive', 'Negative'])) for _ in range(n_texts)]
+
+    start = time.perf_counter()
+    looped = [nb.predict(text) for text in texts]
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched = nb.predict_batch(texts)
+    batch_time = time.perf_counter() - start
+
+    print(f"--- Prediction benchmark ({n_texts:,} texts, |V| = {len(nb.vocab):,}) ---")
+    print(f"predict loop    {loop_time:8.3f}s  {n_texts / loop_time:>12,.0f} texts/sec")
+    print(f"predict_batch   {batch_time:8.3f}s  {n_texts / batch_time:>12,.0f} texts/sec")
+    print(f"Same predictions? {'Yes' if looped == batched else 'No'}")
+
 if __name__ == "__main__":
+    if '--benchmark' in sys.argv:
+        benchmark_predict()
+        benchmark_training()
+        sys.exit()
+
     # 1. Training Data (Text, Label)
     train_data = [
         ("I love this movie", "Positive"),
@@ -95,4 +521,20 @@ if __name__ == "__main__":
         prediction = nb.predict(sent)
         print(f"Sentence: '{sent}'")
         print(f"Predicted Sentiment: {prediction}")
-        print("-" * 30)
\ No newline at end of file
+        print("-" * 30)
+
+    # Same predictions from the compiled model in one batch
+    print(f"Batch Predictions: {nb.predict_batch(test_sentences)}")
+
+    # Incremental update with a new label; the compiled model is patched in place
+    nb.partial_fit([("The plot was okay", "Neutral"), ("An average film", "Neutral")])
+    print(f"Labels after partial_fit: {list(nb.priors)}")
+    print(f"Batch Predictions: {nb.predict_batch(test_sentences + ['an okay average plot'])}")
+
+    # Save once, then serve from a memory-mapped copy without retraining
+    with tempfile.TemporaryDirectory() as directory:
+        model_path = os.path.join(directory, 'naive_bayes.bin')
+        nb.save(model_path)
+        served = NaiveBayesClassifier.load(model_path, mmap=True)
+        print(f"Loaded Predictions: {served.predict_batch(test_sentences + ['an okay average plot'])}")
+        del served
\ No newline at end of file
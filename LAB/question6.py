@@ -1,8 +1,489 @@
+import bisect
+import hashlib
+import json
+import random
+import re
+import sqlite3
 import stanza
 import sys
+import time
+import unicodedata
+from collections import OrderedDict, namedtuple
+
+import numpy as np
 
 # stanza.download('hi')
 
+# Tagging result for one input sentence: parallel lists of word texts and tags
+TaggedSentence = namedtuple('TaggedSentence', ['words', 'upos', 'xpos'])
+
+class HindiTagger:
+    """
+    Warm, batched front-end for the Hindi Stanza pipeline.
+
+    The pipeline is loaded once. tag_batch() sorts its inputs by length so
+    that each bulk call holds sentences of similar size (less padding in the
+    neural batches), sends them through Stanza's bulk_process(), and returns
+    plain Python lists in the original input order.
+    """
+    def __init__(self, pos_batch_size=3000, tokenize_batch_size=32, use_gpu=False, **pipeline_options):
+        self.config = dict(lang='hi', processors='tokenize,pos', use_gpu=use_gpu,
+                           pos_batch_size=pos_batch_size, tokenize_batch_size=tokenize_batch_size,
+                           **pipeline_options)
+        self.nlp = stanza.Pipeline(verbose=False, **self.config)
+
+    @staticmethod
+    def to_tagged(doc):
+        # An input may hold several sentences; flatten them into one result
+        words = [word for sentence in doc.sentences for word in sentence.words]
+        return TaggedSentence([word.text for word in words],
+                              [word.upos for word in words],
+                              [word.xpos for word in words])
+
+    def tag(self, sentence):
+        """Tag a single input with one pipeline call (the unbatched path)."""
+        return self.to_tagged(self.nlp(sentence))
+
+    def tag_batch(self, sentences, batch_size=256):
+        """Tag a list of inputs, batch_size documents per bulk call."""
+        sentences = list(sentences)
+        results = [None] * len(sentences)
+
+        # Group similar lengths together; results are put back by index
+        order = sorted(range(len(sentences)), key=lambda i: len(sentences[i]))
+        for start in range(0, len(order), batch_size):
+            chunk = order[start:start + batch_size]
+            docs = self.nlp.bulk_process([sentences[i] for i in chunk])
+            for i, doc in zip(chunk, docs):
+                results[i] = self.to_tagged(doc)
+
+        return results
+
+def normalize_sentence(sentence):
+    """Unicode NFC, collapsed whitespace: inputs differing only in these share a cache entry."""
+    return " ".join(unicodedata.normalize('NFC', sentence).split())
+
+class CachedTagger:
+    """
+    Content-addressed result cache in front of a HindiTagger.
+
+    Keys are SHA-256 hashes of the normalized sentence plus the pipeline
+    configuration and Stanza version, so changing the model or processors
+    never serves stale tags. Lookups go to an in-memory LRU first, then to
+    an optional SQLite file; only the remaining misses (deduplicated) are
+    sent through the neural pipeline. The disk tier evicts least recently
+    used entries once it grows past max_disk_bytes. Hits only refresh disk
+    recency in memory; the refreshes are written every recency_flush
+    lookups and before eviction, so fully cached batches touch no disk.
+    """
+    def __init__(self, tagger, path=None, memory_size=10000, max_disk_bytes=256 * 1024 * 1024,
+                 recency_flush=10000):
+        self.tagger = tagger
+        self.memory = OrderedDict()
+        self.memory_size = memory_size
+        self.max_disk_bytes = max_disk_bytes
+        self.recency_flush = recency_flush
+        self.recent = {}
+        self.lookups_since_flush = 0
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0}
+
+        config = dict(tagger.config, stanza_version=stanza.__version__)
+        self.config_digest = json.dumps(config, sort_keys=True, ensure_ascii=False)
+
+        self.db = None
+        if path is not None:
+            self.db = sqlite3.connect(path)
+            self.db.execute("CREATE TABLE IF NOT EXISTS tags ("
+                            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                            "size INTEGER NOT NULL, last_used REAL NOT NULL)")
+            self.db.execute("CREATE INDEX IF NOT EXISTS tags_last_used ON tags (last_used)")
+            self.disk_bytes = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM tags").fetchone()[0]
+
+    def key(self, normalized):
+        return hashlib.sha256(f"{self.config_digest}\0{normalized}".encode('utf-8')).hexdigest()
+
+    def remember(self, key, tagged):
+        self.memory[key] = tagged
+        self.memory.move_to_end(key)
+        if len(self.memory) > self.memory_size:
+            self.memory.popitem(last=False)
+
+    def tag_batch(self, sentences):
+        normalized = [normalize_sentence(sentence) for sentence in sentences]
+        keys = [self.key(sentence) for sentence in normalized]
+        found = {}
+        source = {}
+
+        # 1. Memory tier
+        for key in keys:
+            if key in self.memory and key not in found:
+                self.memory.move_to_end(key)
+                found[key] = self.memory[key]
+                source[key] = 'memory_hits'
+
+        # 2. Disk tier
+        wanted = list({key for key in keys if key not in found})
+        if self.db is not None and wanted:
+            for start in range(0, len(wanted), 500):
+                chunk = wanted[start:start + 500]
+                rows = self.db.execute(
+                    f"SELECT key, value FROM tags WHERE key IN ({','.join('?' * len(chunk))})", chunk)
+                for key, value in rows:
+                    found[key] = TaggedSentence(*json.loads(value))
+                    source[key] = 'disk_hits'
+                    self.remember(key, found[key])
+
+        # Disk recency follows every hit, whichever tier served it, so that
+        # sentences kept hot in memory are not the first evicted from disk;
+        # it is buffered here and written by flush_recency()
+        if self.db is not None and found:
+            now = time.time()
+            self.recent.update(dict.fromkeys(found, now))
+
+        # 3. Pipeline, once per distinct missing sentence
+        missing = {}
+        for key, sentence in zip(keys, normalized):
+            if key not in found and key not in missing:
+                missing[key] = sentence
+                source[key] = 'misses'
+        if missing:
+            tagged = self.tagger.tag_batch(list(missing.values()))
+            for key, result in zip(missing, tagged):
+                found[key] = result
+                self.remember(key, result)
+            if self.db is not None:
+                self.store(zip(missing, tagged))
+
+        # One stat per lookup: repeats within the batch are served from
+        # memory, so they count as memory hits
+        counted = set()
+        for key in keys:
+            self.stats[source[key] if key not in counted else 'memory_hits'] += 1
+            counted.add(key)
+
+        # Commit only when the disk tier changed
+        if self.db is not None:
+            self.lookups_since_flush += len(keys)
+            changed = bool(missing)
+            if self.recent and self.lookups_since_flush >= self.recency_flush:
+                self.flush_recency()
+                changed = True
+            if changed:
+                self.db.commit()
+        return [found[key] for key in keys]
+
+    def flush_recency(self):
+        """Write buffered last_used refreshes to the disk tier (not committed)."""
+        if self.recent:
+            self.db.executemany("UPDATE tags SET last_used = ? WHERE key = ?",
+                                [(used, key) for key, used in self.recent.items()])
+            self.recent.clear()
+        self.lookups_since_flush = 0
+
+    def store(self, items):
+        now = time.time()
+        rows = []
+        for key, tagged in items:
+            value = json.dumps(list(tagged), ensure_ascii=False)
+            rows.append((key, value, len(value.encode('utf-8')), now))
+        self.db.executemany("INSERT OR REPLACE INTO tags VALUES (?, ?, ?, ?)", rows)
+        self.disk_bytes += sum(row[2] for row in rows)
+
+        if self.disk_bytes > self.max_disk_bytes:
+            self.evict(int(self.max_disk_bytes * 0.9))
+
+    def evict(self, target_bytes):
+        """Drop least recently used disk entries until the tier is under target_bytes."""
+        self.flush_recency()
+        # Recount first: INSERT OR REPLACE may have overwritten existing rows
+        self.disk_bytes = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM tags").fetchone()[0]
+        rows = self.db.execute("SELECT key, size FROM tags ORDER BY last_used")
+        victims = []
+        for key, size in rows:
+            if self.disk_bytes <= target_bytes:
+                break
+            victims.append((key,))
+            self.disk_bytes -= size
+        self.db.executemany("DELETE FROM tags WHERE key = ?", victims)
+        self.stats['evictions'] += len(victims)
+
+    def hit_rate(self):
+        hits = self.stats['memory_hits'] + self.stats['disk_hits']
+        lookups = hits + self.stats['misses']
+        return hits / lookups if lookups else 0.0
+
+# Whitespace tokenization with Hindi/Latin punctuation split off (danda, double danda, ...)
+HINDI_PUNCTUATION = '\u0964\u0965.,!?;:\'"()'
+FAST_TOKEN = re.compile(f"[^\\s{re.escape(HINDI_PUNCTUATION)}]+|[{re.escape(HINDI_PUNCTUATION)}]")
+
+def char_spans(words):
+    """(start, end) of each word in the whitespace-free concatenation of words."""
+    spans = []
+    offset = 0
+    for word in words:
+        spans.append((offset, offset + len(word)))
+        offset += len(word)
+    return spans
+
+def project_tags(words, reference):
+    """
+    Tags for `words` (e.g. FAST_TOKEN output) taken from a differently
+    tokenized TaggedSentence of the same text: each word gets the UPOS/XPOS
+    of the reference word covering its first character.
+    """
+    starts = [start for start, _ in char_spans(reference.words)]
+    upos, xpos = [], []
+    for start, _ in char_spans(words):
+        i = max(bisect.bisect_right(starts, start) - 1, 0)
+        upos.append(reference.upos[i] if reference.words else None)
+        xpos.append(reference.xpos[i] if reference.words else None)
+    return upos, xpos
+
+def aligned_agreement(tagged, reference):
+    """
+    (agreeing, total) tokens of `tagged` against a Stanza reference, aligned
+    by character span: a reference word counts as agreeing only if `tagged`
+    has a word with exactly the same span and the same UPOS.
+    """
+    predicted = dict(zip(char_spans(tagged.words), tagged.upos))
+    agree = sum(predicted.get(span) == tag for span, tag in zip(char_spans(reference.words), reference.upos))
+    return agree, len(reference.words)
+
+class PerceptronTagger:
+    """
+    Averaged-perceptron UPOS tagger with NumPy weights, meant to be trained
+    on Stanza output (see train_from_stanza()).
+
+    Weights are a (features x tags) matrix; a token's scores are the sum of
+    the rows of its active features. Averaging uses the usual lazy
+    bookkeeping: each cell remembers when it last changed and how much it
+    has accumulated since.
+    """
+    START = ('-START-', '-START2-')
+
+    def __init__(self):
+        self.tags = []
+        self.feature_index = {}
+        self.weights = None
+
+    @staticmethod
+    def word_features(words, i):
+        word = words[i]
+        previous_word = words[i - 1] if i > 0 else '-START-'
+        next_word = words[i + 1] if i + 1 < len(words) else '-END-'
+        return ['bias', 'w=' + word, 's3=' + word[-3:], 's2=' + word[-2:], 's1=' + word[-1:],
+                'p1=' + word[:1], 'w-1=' + previous_word, 'w+1=' + next_word,
+                's3-1=' + previous_word[-3:], 's3+1=' + next_word[-3:]]
+
+    @staticmethod
+    def tag_features(previous_tag, previous_tag2):
+        return ['t-1=' + previous_tag, 't-2=' + previous_tag2,
+                't-1,t-2=' + previous_tag + ',' + previous_tag2]
+
+    def feature_ids(self, words, i, previous_tag, previous_tag2):
+        index = self.feature_index
+        features = self.word_features(words, i) + self.tag_features(previous_tag, previous_tag2)
+        return [index[f] for f in features if f in index]
+
+    def train(self, tagged_sentences, epochs=5, seed=0):
+        """Train on a list of (words, upos) pairs."""
+        tagged_sentences = list(tagged_sentences)
+        self.tags = sorted({tag for _, tags in tagged_sentences for tag in tags})
+        tag_ids = {tag: i for i, tag in enumerate(self.tags)}
+
+        # 1. Feature vocabulary: word features from the data, tag features for every tag pair
+        features = set()
+        for words, _ in tagged_sentences:
+            for i in range(len(words)):
+                features.update(self.word_features(words, i))
+        history = self.tags + list(self.START)
+        for previous_tag in history:
+            for previous_tag2 in history:
+                features.update(self.tag_features(previous_tag, previous_tag2))
+        self.feature_index = {f: i for i, f in enumerate(sorted(features))}
+
+        shape = (len(self.feature_index), len(self.tags))
+        weights = np.zeros(shape)
+        totals = np.zeros(shape)
+        stamps = np.zeros(shape)
+        instances = 0
+
+        def update(ids, tag, delta):
+            # Lazy averaging: bank weight * (time since last change) before changing
+            totals[ids, tag] += (instances - stamps[ids, tag]) * weights[ids, tag]
+            stamps[ids, tag] = instances
+            weights[ids, tag] += delta
+
+        # 2. Perceptron passes, shuffling sentences between epochs
+        rng = random.Random(seed)
+        for _ in range(epochs):
+            rng.shuffle(tagged_sentences)
+            for words, gold_tags in tagged_sentences:
+                previous_tag, previous_tag2 = self.START
+                for i, gold in enumerate(gold_tags):
+                    ids = np.array(self.feature_ids(words, i, previous_tag, previous_tag2))
+                    guess = int(weights[ids].sum(axis=0).argmax())
+                    truth = tag_ids[gold]
+                    instances += 1
+                    if guess != truth:
+                        update(ids, truth, 1.0)
+                        update(ids, guess, -1.0)
+                    # Condition on the model's own guesses, as at tagging time
+                    previous_tag2, previous_tag = previous_tag, self.tags[guess]
+
+        # 3. Average
+        totals += (instances - stamps) * weights
+        self.weights = (totals / max(instances, 1)).astype(np.float32)
+        return self
+
+    def tag_words(self, words):
+        """Return (upos list, confidence) where confidence is the lowest per-token softmax probability."""
+        tags = []
+        confidence = 1.0
+        previous_tag, previous_tag2 = self.START
+        for i in range(len(words)):
+            scores = self.weights[self.feature_ids(words, i, previous_tag, previous_tag2)].sum(axis=0)
+            best = int(scores.argmax())
+            probabilities = np.exp(scores - scores[best])
+            confidence = min(confidence, float(1.0 / probabilities.sum()))
+            tags.append(self.tags[best])
+            previous_tag2, previous_tag = previous_tag, self.tags[best]
+        return tags, confidence
+
+    @classmethod
+    def train_from_stanza(cls, tagger, sentences, **train_options):
+        """
+        Distil: tag sentences with a HindiTagger and train on its UPOS,
+        projected onto FAST_TOKEN tokens so that training sees the same
+        tokenization the fast path serves.
+        """
+        sentences = list(sentences)
+        examples = []
+        for sentence, tagged in zip(sentences, tagger.tag_batch(sentences)):
+            words = FAST_TOKEN.findall(sentence)
+            if words and tagged.words:
+                examples.append((words, project_tags(words, tagged)[0]))
+        return cls().train(examples, **train_options)
+
+class FastPathTagger:
+    """
+    Perceptron first, Stanza only when needed.
+
+    Sentences are tokenized with FAST_TOKEN and tagged by the perceptron;
+    any sentence whose confidence is below threshold is re-tagged by the
+    neural pipeline in one batch. Every result uses FAST_TOKEN tokens:
+    Stanza's tags are projected onto them (see project_tags()), so the
+    output tokenization does not depend on which path served a sentence.
+    Fast-path results carry UPOS only (xpos entries are None).
+    fallback_count tells how often the slow path ran.
+    """
+    def __init__(self, perceptron, tagger, threshold=0.8):
+        self.perceptron = perceptron
+        self.tagger = tagger
+        self.threshold = threshold
+        self.fast_count = 0
+        self.fallback_count = 0
+
+    def tag_batch(self, sentences):
+        sentences = list(sentences)
+        results = [None] * len(sentences)
+        fallback = []
+
+        tokenized = [FAST_TOKEN.findall(sentence) for sentence in sentences]
+        for i, words in enumerate(tokenized):
+            upos, confidence = self.perceptron.tag_words(words)
+            if confidence >= self.threshold:
+                results[i] = TaggedSentence(words, upos, [None] * len(words))
+                self.fast_count += 1
+            else:
+                fallback.append(i)
+
+        if fallback:
+            self.fallback_count += len(fallback)
+            for i, tagged in zip(fallback, self.tagger.tag_batch([sentences[i] for i in fallback])):
+                results[i] = TaggedSentence(tokenized[i], *project_tags(tokenized[i], tagged))
+
+        return results
+
+def benchmark_fast_path(sentences, threshold=0.8, test_fraction=0.2):
+    """
+    Distil a perceptron from Stanza on part of `sentences`, then report on
+    the rest: UPOS agreement with Stanza (aligned by token span, see
+    aligned_agreement()) of the perceptron alone and of the fast path with
+    fallback, and sentences/sec for Stanza, the perceptron and the fast path.
+    """
+    sentences = list(sentences)
+    split = max(1, int(len(sentences) * (1 - test_fraction)))
+    train_sentences, test_sentences = sentences[:split], sentences[split:] or sentences[:1]
+
+    tagger = HindiTagger()
+    start = time.perf_counter()
+    perceptron = PerceptronTagger.train_from_stanza(tagger, train_sentences)
+    print(f"--- Fast-path benchmark ({len(train_sentences)} train / {len(test_sentences)} test sentences) ---")
+    print(f"Distillation (Stanza tagging + training): {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    reference = tagger.tag_batch(test_sentences)
+    stanza_time = time.perf_counter() - start
+
+    # Perceptron alone, on the FAST_TOKEN tokens it is served with
+    start = time.perf_counter()
+    perceptron_only = []
+    for sentence in test_sentences:
+        words = FAST_TOKEN.findall(sentence)
+        perceptron_only.append(TaggedSentence(words, perceptron.tag_words(words)[0], [None] * len(words)))
+    perceptron_time = time.perf_counter() - start
+
+    fast = FastPathTagger(perceptron, tagger, threshold=threshold)
+    start = time.perf_counter()
+    fast_path = fast.tag_batch(test_sentences)
+    fast_time = time.perf_counter() - start
+
+    n = len(test_sentences)
+    total = sum(len(tagged.words) for tagged in reference)
+    for name, results in [('perceptron', perceptron_only), ('fast path', fast_path)]:
+        agree = sum(aligned_agreement(tagged, ref)[0] for tagged, ref in zip(results, reference))
+        print(f"{name:<11} agreement with Stanza UPOS: {agree / max(total, 1):.2%} of {total} tokens")
+    print(f"stanza (batched)  {n / stanza_time:10.1f} sentences/sec")
+    print(f"perceptron        {n / perceptron_time:10.1f} sentences/sec")
+    print(f"fast path         {n / fast_time:10.1f} sentences/sec  "
+          f"(threshold {threshold}, {fast.fallback_count} of {n} fell back to Stanza)")
+
+def benchmark_tagging(repeat=100):
+    """Sentences/sec on CPU: one pipeline call per sentence against tag_batch()."""
+    base_sentences = [
+        "राम एक अच्छा लड़का है।",
+        "वह मुंबई में रहता है।",
+        "मैंने आज एक नई किताब खरीदी।",
+        "भारत की राजधानी दिल्ली है।",
+        "बिल्ली चूहा खाती है।",
+        "छात्र कृत्रिम बुद्धिमत्ता का अध्ययन करते हैं।",
+    ]
+    sentences = base_sentences * repeat
+
+    tagger = HindiTagger()
+    print(f"--- Tagging benchmark ({len(sentences)} sentences, CPU) ---")
+
+    start = time.perf_counter()
+    single = [tagger.tag(sentence) for sentence in sentences]
+    elapsed = time.perf_counter() - start
+    print(f"per-sentence   {elapsed:8.2f}s  {len(sentences) / elapsed:8.1f} sentences/sec")
+
+    start = time.perf_counter()
+    batched = tagger.tag_batch(sentences)
+    elapsed = time.perf_counter() - start
+    print(f"tag_batch      {elapsed:8.2f}s  {len(sentences) / elapsed:8.1f} sentences/sec")
+    print(f"Same tags? {'Yes' if single == batched else 'No'}")
+
+    # Repeated inputs: only the distinct sentences reach the pipeline
+    cached_tagger = CachedTagger(tagger)
+    start = time.perf_counter()
+    cached = cached_tagger.tag_batch(sentences)
+    elapsed = time.perf_counter() - start
+    print(f"cached         {elapsed:8.2f}s  {len(sentences) / elapsed:8.1f} sentences/sec  "
+          f"hit rate {cached_tagger.hit_rate():.1%}")
+    print(f"Same tags? {'Yes' if cached == batched else 'No'}")
+
 def pos_tagging_hindi():
     try:
         # 1. Load Pretrained Model (Hindi)
@@ -60,4 +541,14 @@ def pos_tagging_hindi():
     print("   - Ambiguity: Words like 'kal' can mean both 'yesterday' and 'tomorrow' depending on tense.")
 
 if __name__ == "__main__":
+    if '--benchmark' in sys.argv:
+        benchmark_tagging()
+        sys.exit()
+
+    if '--benchmark-fast' in sys.argv:
+        # python question6.py --benchmark-fast sentences.txt  (one Hindi sentence per line)
+        with open(sys.argv[sys.argv.index('--benchmark-fast') + 1], encoding='utf-8') as f:
+            benchmark_fast_path(line.strip() for line in f if line.strip())
+        sys.exit()
+
     pos_tagging_hindi()
\ No newline at end of file
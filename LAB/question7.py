@@ -1,5 +1,16 @@
 import pandas as pd
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import time
+import tracemalloc
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy import sparse
 
 def compute_translation_probabilities():
     # 1. Manually Construct Corpus (English, Malayalam)
@@ -89,5 +100,612 @@ def compute_translation_probabilities():
     print(f"P('pusthakam' | 'book') = {df_p_f_given_e.loc['book', 'pusthakam']}")
     print("Reason: 'book' appears 5 times, 'pusthakam' appears 5 times with it. 5/5 = 1.0")
 
+    # Same probabilities from the sparse backend, as top-k lists
+    top_f_given_e, top_e_given_f = sparse_translation_probabilities(corpus, top_k=2)
+    print("\n--- Top-2 Translations (sparse backend) ---")
+    for e, translations in top_f_given_e.items():
+        print(f"P(f|{e!r}): {translations}")
+    for f, translations in top_e_given_f.items():
+        print(f"P(e|{f!r}): {translations}")
+
+    # IBM Model 1: EM explains 'the'/'read' away, leaving 'book' -> 'pusthakam'
+    print("\n--- IBM Model 1 (EM) ---")
+    model = IBMModel1().fit(corpus, iterations=20)
+    for e, translations in model.top_translations(k=2).items():
+        print(f"t(f|{e!r}): {[(f, round(p, 4)) for f, p in translations]}")
+
+# Sparse backend
+def encode_corpus(corpus):
+    """
+    Tokenize (lowercase + whitespace split, as above) and integer-encode a
+    parallel corpus in one pass. Returns (english_vocab, malayalam_vocab,
+    encoded) where encoded is a list of (e_ids, f_ids) int32 arrays.
+    """
+    english_ids = {}
+    malayalam_ids = {}
+    encoded = []
+    for eng, mal in corpus:
+        e_ids = [english_ids.setdefault(e, len(english_ids)) for e in eng.lower().split()]
+        f_ids = [malayalam_ids.setdefault(f, len(malayalam_ids)) for f in mal.lower().split()]
+        encoded.append((np.array(e_ids, dtype=np.int32), np.array(f_ids, dtype=np.int32)))
+    return list(english_ids), list(malayalam_ids), encoded
+
+def cooccurrence_counts(encoded, n_english, n_malayalam):
+    """
+    Build the (English x Malayalam) co-occurrence matrix as CSR, plus the
+    per-word sentence counts Count(e) and Count(f), with the same counting
+    rules as compute_translation_probabilities().
+    """
+    rows, columns = [], []
+    count_e = np.zeros(n_english, dtype=np.int64)
+    count_f = np.zeros(n_malayalam, dtype=np.int64)
+
+    for e_ids, f_ids in encoded:
+        # Sentence counts: each word at most once per sentence
+        count_e[np.unique(e_ids)] += 1
+        count_f[np.unique(f_ids)] += 1
+        # Every (e, f) token pair in the sentence
+        rows.append(np.repeat(e_ids, len(f_ids)))
+        columns.append(np.tile(f_ids, len(e_ids)))
+
+    rows = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int32)
+    columns = np.concatenate(columns) if columns else np.zeros(0, dtype=np.int32)
+    data = np.ones(len(rows), dtype=np.int64)
+    # Duplicate (row, column) entries are summed when converting to CSR
+    counts = sparse.coo_matrix((data, (rows, columns)), shape=(n_english, n_malayalam)).tocsr()
+    return counts, count_e, count_f
+
+def top_k_per_row(matrix, labels, column_labels, k):
+    """{row label: [(column label, value), ...]} with the k largest entries of each CSR row."""
+    result = {}
+    for row, label in enumerate(labels):
+        start, end = matrix.indptr[row], matrix.indptr[row + 1]
+        values = matrix.data[start:end]
+        columns = matrix.indices[start:end]
+        if len(values) > k:
+            keep = np.argpartition(-values, k - 1)[:k]
+            values, columns = values[keep], columns[keep]
+        order = np.lexsort((columns, -values))
+        result[label] = [(column_labels[columns[i]], float(values[i])) for i in order]
+    return result
+
+def sparse_translation_probabilities(corpus, top_k=3):
+    """
+    Same P(f|e) and P(e|f) as compute_translation_probabilities(), computed
+    on sparse integer-indexed matrices with vectorized row/column
+    normalization. Returns the top_k translations per word in each direction.
+    """
+    english_vocab, malayalam_vocab, encoded = encode_corpus(corpus)
+    counts, count_e, count_f = cooccurrence_counts(encoded, len(english_vocab), len(malayalam_vocab))
+    return translation_probabilities_from_counts(counts, count_e, count_f,
+                                                 english_vocab, malayalam_vocab, top_k)
+
+def translation_probabilities_from_counts(counts, count_e, count_f, english_vocab, malayalam_vocab, top_k=3):
+    """Top-k P(f|e) and P(e|f) from a CSR co-occurrence matrix and sentence counts."""
+    counts = counts.astype(np.float64)
+
+    # P(f|e) = Count(e, f) / Count(e): scale each row
+    p_f_given_e = (sparse.diags(1.0 / np.maximum(count_e, 1)) @ counts).tocsr()
+    # P(e|f) = Count(e, f) / Count(f): scale each column, then index by f
+    p_e_given_f = (counts @ sparse.diags(1.0 / np.maximum(count_f, 1))).T.tocsr()
+
+    return (top_k_per_row(p_f_given_e, english_vocab, malayalam_vocab, top_k),
+            top_k_per_row(p_e_given_f, malayalam_vocab, english_vocab, top_k))
+
+# Out-of-core co-occurrence counting
+# Shard records: (e_id, f_id, count), sorted by (e_id, f_id)
+RECORD = np.dtype([('e', '<u4'), ('f', '<u4'), ('count', '<u8')])
+# Spill memory per buffered key: the key, then, if all keys are distinct,
+# run mask, run starts, run lengths, the record written out and temporaries
+SPILL_BYTES_PER_KEY = 64
+# Shards merged per pass; more shards are merged in several passes
+MERGE_FAN_IN = 16
+# Merge memory per buffered record, across the read blocks and the
+# concatenate/sort/reduce temporaries of one merge round
+MERGE_BYTES_PER_RECORD = 160
+# Merged table layout (little-endian), the arrays of a CSR matrix:
+#   magic b'COO1' | n_english u64 | n_malayalam u64 | nnz u64 | index width u64 (4 or 8)
+#   indptr  (n_english + 1) x index   row starts
+#   indices nnz x index               Malayalam ids, ascending per row
+#   (zero padding to 8 bytes)
+#   counts  nnz x i64
+TABLE_MAGIC = b'COO1'
+TABLE_HEADER = struct.Struct('<4sQQQQ')
+
+def read_parallel_files(english_path, malayalam_path):
+    """Yield (english, malayalam) sentence pairs from two line-aligned files."""
+    with open(english_path, encoding='utf-8') as eng_f, open(malayalam_path, encoding='utf-8') as mal_f:
+        for eng, mal in zip(eng_f, mal_f):
+            yield eng, mal
+
+def _shard_file(shard_dir, level, index):
+    """Path of shard index written by merge pass level (0 for the spilled shards)."""
+    return os.path.join(shard_dir, f'{level}-{index}.shard')
+
+def _flush_pair_shard(keys, path):
+    """Aggregate buffered (e << 32 | f) keys, sorted in place, into a sorted record shard."""
+    keys.sort()
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    records = np.empty(len(starts), dtype=RECORD)
+    records['e'] = keys[starts] >> np.uint64(32)
+    records['f'] = keys[starts] & np.uint64(0xFFFFFFFF)
+    records['count'] = np.diff(np.r_[starts, len(keys)])
+    del starts
+    records.tofile(path)
+
+def _read_blocks(path, block_records):
+    """Yield (keys, counts) arrays from a record shard, block_records at a time."""
+    with open(path, 'rb') as f:
+        while True:
+            records = np.fromfile(f, dtype=RECORD, count=block_records)
+            if not len(records):
+                return
+            keys = (records['e'].astype(np.uint64) << np.uint64(32)) | records['f']
+            yield keys, records['count'].astype(np.int64)
+
+def _merge_blocks(paths, block_records):
+    """
+    Merge sorted shards into sorted (keys, counts) blocks, summing the counts
+    of equal keys. Each round takes, from every shard's current block, the
+    keys up to the smallest block-end key: no shard has anything at or below
+    it left unread, so those keys are final.
+    """
+    heads = []
+    for path in paths:
+        reader = _read_blocks(path, block_records)
+        block = next(reader, None)
+        if block is not None:
+            heads.append([block[0], block[1], reader])
+
+    while heads:
+        bound = min(keys[-1] for keys, _, _ in heads)
+        part_keys, part_counts = [], []
+        for head in heads:
+            n = int(np.searchsorted(head[0], bound, side='right'))
+            part_keys.append(head[0][:n])
+            part_counts.append(head[1][:n])
+            head[0], head[1] = head[0][n:], head[1][n:]
+
+        keys = np.concatenate(part_keys)
+        counts = np.concatenate(part_counts)
+        del part_keys, part_counts
+        order = np.argsort(keys, kind='stable')
+        keys, counts = keys[order], counts[order]
+        del order
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        yield keys[starts], np.add.reduceat(counts, starts)
+        del keys, counts, starts
+
+        # Refill exhausted heads, dropping finished shards
+        for head in heads:
+            if not len(head[0]):
+                block = next(head[2], None)
+                head[0], head[1] = block if block is not None else (None, None)
+        heads = [head for head in heads if head[0] is not None]
+
+def _merge_to_shard(paths, path, block_records):
+    """Merge sorted record shards into one new sorted shard at path."""
+    with open(path, 'wb') as f:
+        for keys, counts in _merge_blocks(paths, block_records):
+            records = np.empty(len(keys), dtype=RECORD)
+            records['e'] = keys >> np.uint64(32)
+            records['f'] = keys & np.uint64(0xFFFFFFFF)
+            records['count'] = counts
+            records.tofile(f)
+
+def _write_merged(indices_f, counts_f, row_counts, keys, counts):
+    """Append a block of merged (key, count) to the side files and tally rows."""
+    row_counts += np.bincount((keys >> np.uint64(32)).astype(np.int64), minlength=len(row_counts))
+    (keys & np.uint64(0xFFFFFFFF)).astype('<i8').tofile(indices_f)
+    counts.astype('<i8').tofile(counts_f)
+
+def _write_table(out_path, row_counts, n_malayalam, nnz, indices_path, counts_path, block_records):
+    """Assemble header, indptr and the side files into the final CSR table."""
+    # 32-bit indices whenever they fit: scipy keeps indptr and indices in
+    # one dtype and would otherwise copy them when wrapping the mmap
+    index_dtype = np.dtype('<i4') if max(nnz, n_malayalam) < 2 ** 31 else np.dtype('<i8')
+    indptr = np.zeros(len(row_counts) + 1, dtype=index_dtype)
+    np.cumsum(row_counts, out=indptr[1:])
+    with open(out_path, 'wb') as out:
+        out.write(TABLE_HEADER.pack(TABLE_MAGIC, len(row_counts), n_malayalam, nnz, index_dtype.itemsize))
+        indptr.tofile(out)
+        with open(indices_path, 'rb') as f:
+            while True:
+                block = np.fromfile(f, dtype='<i8', count=block_records)
+                if not len(block):
+                    break
+                block.astype(index_dtype).tofile(out)
+        out.write(b'\0' * (-out.tell() % 8))
+        with open(counts_path, 'rb') as f:
+            shutil.copyfileobj(f, out)
+
+def count_cooccurrences_external(pairs, out_path, memory_budget=64 << 20, shard_dir=None,
+                                 fan_in=MERGE_FAN_IN):
+    """
+    Co-occurrence counting with bounded memory, using the counting rules of
+    compute_translation_probabilities().
+
+    Sentence pairs are streamed (e.g. from read_parallel_files()); the
+    |e|*|f| pair keys of each sentence go to a preallocated buffer of
+    memory_budget // SPILL_BYTES_PER_KEY keys, which is sorted in place,
+    aggregated and spilled to a sorted shard on disk when full. The shards
+    are merged at most fan_in at a time, in NumPy blocks sized so that one
+    merge stays within memory_budget; intermediate passes go back to disk
+    until fan_in or fewer shards remain, and the last pass writes out_path,
+    a CSR table for load_cooccurrence_table(). The vocabularies and per-word
+    counts are the only memory outside the budget.
+    Returns (english_vocab, malayalam_vocab, count_e, count_f).
+    """
+    english_ids, malayalam_ids = {}, {}
+    count_e, count_f = [], []
+    shard_dir = tempfile.mkdtemp(dir=shard_dir)
+    n_shards = 0
+    try:
+        # 1. Encode and buffer pair keys, spilling sorted shards at the budget
+        buffer = np.empty(max(1, memory_budget // SPILL_BYTES_PER_KEY), dtype=np.uint64)
+        filled = 0
+        for eng, mal in pairs:
+            e_ids = [english_ids.setdefault(e, len(english_ids)) for e in eng.lower().split()]
+            f_ids = [malayalam_ids.setdefault(f, len(malayalam_ids)) for f in mal.lower().split()]
+            count_e.extend([0] * (len(english_ids) - len(count_e)))
+            count_f.extend([0] * (len(malayalam_ids) - len(count_f)))
+            for e in set(e_ids): count_e[e] += 1
+            for f in set(f_ids): count_f[f] += 1
+            if not e_ids or not f_ids:
+                continue
+
+            keys = (np.repeat(np.array(e_ids, dtype=np.uint64) << np.uint64(32), len(f_ids))
+                    | np.tile(np.array(f_ids, dtype=np.uint64), len(e_ids)))
+            if filled + len(keys) > len(buffer) and filled:
+                _flush_pair_shard(buffer[:filled], _shard_file(shard_dir, 0, n_shards))
+                n_shards += 1
+                filled = 0
+            if len(keys) > len(buffer):
+                # A sentence pair larger than the whole buffer is its own shard
+                _flush_pair_shard(keys, _shard_file(shard_dir, 0, n_shards))
+                n_shards += 1
+                continue
+            buffer[filled:filled + len(keys)] = keys
+            filled += len(keys)
+        if filled:
+            _flush_pair_shard(buffer[:filled], _shard_file(shard_dir, 0, n_shards))
+            n_shards += 1
+        del buffer
+
+        # 2. Multi-pass merge with bounded fan-in and read blocks
+        block_records = max(1, memory_budget // (fan_in * MERGE_BYTES_PER_RECORD))
+        level = 0
+        while n_shards > fan_in:
+            for start in range(0, n_shards, fan_in):
+                group = [_shard_file(shard_dir, level, index)
+                         for index in range(start, min(start + fan_in, n_shards))]
+                _merge_to_shard(group, _shard_file(shard_dir, level + 1, start // fan_in), block_records)
+                for path in group:
+                    os.remove(path)
+            n_shards = -(-n_shards // fan_in)
+            level += 1
+        shards = [_shard_file(shard_dir, level, index) for index in range(n_shards)]
+
+        # 3. Last pass: indices and counts go to side files, rows are only tallied
+        indices_path, counts_path = (os.path.join(shard_dir, name) for name in ('indices', 'counts'))
+        row_counts = np.zeros(len(english_ids), dtype=np.int64)
+        nnz = 0
+        with open(indices_path, 'wb') as indices_f, open(counts_path, 'wb') as counts_f:
+            for keys, counts in _merge_blocks(shards, block_records):
+                _write_merged(indices_f, counts_f, row_counts, keys, counts)
+                nnz += len(keys)
+
+        # 4. Final table: header, indptr, indices, counts
+        _write_table(out_path, row_counts, len(malayalam_ids), nnz, indices_path, counts_path,
+                     block_records)
+    finally:
+        shutil.rmtree(shard_dir, ignore_errors=True)
+
+    return (list(english_ids), list(malayalam_ids),
+            np.array(count_e, dtype=np.int64), np.array(count_f, dtype=np.int64))
+
+def load_cooccurrence_table(path):
+    """
+    Memory-map a table written by count_cooccurrences_external() as a CSR
+    co-occurrence matrix. The matrix wraps the mapped arrays without copying.
+    """
+    with open(path, 'rb') as f:
+        magic, n_english, n_malayalam, nnz, width = TABLE_HEADER.unpack(f.read(TABLE_HEADER.size))
+    if magic != TABLE_MAGIC:
+        raise ValueError(f"{path} is not a co-occurrence table")
+
+    index_dtype = np.dtype(f'<i{width}')
+    offset = TABLE_HEADER.size
+    indptr = np.memmap(path, dtype=index_dtype, mode='r', offset=offset, shape=(n_english + 1,))
+    offset += indptr.nbytes
+    indices, counts = np.zeros(0, index_dtype), np.zeros(0, '<i8')
+    if nnz:
+        indices = np.memmap(path, dtype=index_dtype, mode='r', offset=offset, shape=(nnz,))
+        offset += indices.nbytes
+        offset += -offset % 8
+        counts = np.memmap(path, dtype='<i8', mode='r', offset=offset, shape=(nnz,))
+    return sparse.csr_matrix((counts, indices, indptr), shape=(n_english, n_malayalam))
+
+# IBM Model 1
+def _shard_path(directory, shard, name):
+    return os.path.join(directory, f"shard{shard:04d}_{name}.npy")
+
+def em_shard(directory, shard, t_path):
+    """
+    E-step over one shard of sentence pairs. Every (e, f) token pair of the
+    shard is an entry of `local`, an index into the shard's `touched` slice
+    of the sparse t(f|e) table; `group` is the Malayalam token it belongs to.
+    Returns (shard, expected counts aligned with touched, log-likelihood).
+    """
+    t = np.load(t_path, mmap_mode='r')
+    touched = np.load(_shard_path(directory, shard, 'touched'))
+    local = np.load(_shard_path(directory, shard, 'local'), mmap_mode='r')
+    group = np.load(_shard_path(directory, shard, 'group'), mmap_mode='r')
+
+    t_pairs = t[touched][local]
+    # Sum over alignments of each Malayalam token: sum_i t(f_j | e_i)
+    denominators = np.bincount(group, weights=t_pairs)
+    posteriors = t_pairs / denominators[group]
+    expected = np.bincount(local, weights=posteriors, minlength=len(touched))
+    return shard, expected, float(np.log(denominators).sum())
+
+class IBMModel1:
+    """
+    IBM Model 1 lexical translation model t(f|e), trained with EM.
+    t(f|e) is a CSR matrix whose sparsity pattern is the co-occurrence
+    pattern of the corpus (EM never moves mass outside it).
+    """
+    NULL = '<null>'
+
+    def __init__(self, use_null=True):
+        self.use_null = use_null
+        self.english_vocab = []
+        self.malayalam_vocab = []
+        self.t = None
+        self.history = []
+
+    def _write_shards(self, encoded, directory, shard_size):
+        """
+        Flatten each shard into token-pair arrays, once: pairs are laid out
+        Malayalam-token-major, so all alignments of one f_j are contiguous.
+        The sparsity pattern is the union of the shards' distinct pair keys,
+        merged shard by shard, so the corpus' token pairs are never all in
+        memory at once.
+        Returns ([(shard, touched, log_length_term, n_tokens)], keys), keys
+        being the sorted e * n_f + f of every stored entry.
+        """
+        null = len(self.english_vocab) - 1
+        n_f = len(self.malayalam_vocab)
+        shards = []
+        keys = np.empty(0, dtype=np.int64)
+        for shard, start in enumerate(range(0, len(encoded), shard_size)):
+            pair_keys, groups, n_tokens, length_term = [], [], 0, 0.0
+            for e_ids, f_ids in encoded[start:start + shard_size]:
+                if self.use_null:
+                    e_ids = np.append(e_ids, null)
+                l, m = len(e_ids), len(f_ids)
+                if l == 0 or m == 0:
+                    continue
+                pair_keys.append(np.tile(e_ids.astype(np.int64) * n_f, m) + np.repeat(f_ids, l))
+                groups.append(np.repeat(np.arange(n_tokens, n_tokens + m), l))
+                n_tokens += m
+                length_term += m * np.log(l)
+            if not pair_keys:
+                continue
+
+            # Distinct pairs of the shard, merged into the pattern
+            shard_keys, local = np.unique(np.concatenate(pair_keys), return_inverse=True)
+            del pair_keys
+            keys = np.union1d(keys, shard_keys)
+            np.save(_shard_path(directory, shard, 'keys'), shard_keys)
+            np.save(_shard_path(directory, shard, 'local'), local.astype(np.int32))
+            np.save(_shard_path(directory, shard, 'group'), np.concatenate(groups).astype(np.int32))
+            shards.append((shard, length_term, n_tokens))
+
+        # Position of every shard pair in the global CSR data array; shard
+        # keys are sorted, so local still indexes these positions
+        located = []
+        for shard, length_term, n_tokens in shards:
+            key_path = _shard_path(directory, shard, 'keys')
+            touched = np.searchsorted(keys, np.load(key_path))
+            os.remove(key_path)
+            np.save(_shard_path(directory, shard, 'touched'), touched)
+            located.append((shard, touched, length_term, n_tokens))
+        return located, keys
+
+    def fit(self, corpus, iterations=10, workers=1, shard_size=50000, tol=1e-4, verbose=True):
+        """
+        Train on a list of (english, malayalam) sentence pairs. Each iteration
+        runs the E-step shard by shard (in a process pool when workers > 1),
+        merges the expected counts and renormalizes t(f|e) per English word.
+        Stops early once the per-token log-likelihood improves by less than tol.
+        """
+        # 1. Integer-encode with the same tokenization as the sparse backend
+        self.english_vocab, self.malayalam_vocab, encoded = encode_corpus(corpus)
+        if self.use_null:
+            self.english_vocab.append(self.NULL)
+        n_e, n_f = len(self.english_vocab), len(self.malayalam_vocab)
+        self.history = []
+
+        with tempfile.TemporaryDirectory() as directory:
+            # 2. Shards, and the sparsity pattern of t(f|e) from their pairs
+            shards, keys = self._write_shards(encoded, directory, shard_size)
+            rows, indices = np.divmod(keys, n_f)
+            del keys
+            row_sizes = np.bincount(rows, minlength=n_e)
+            indptr = np.zeros(n_e + 1, dtype=np.int64)
+            np.cumsum(row_sizes, out=indptr[1:])
+
+            # 3. Uniform initialization over the co-occurring words of each e
+            t = 1.0 / row_sizes[rows]
+
+            touched_of = {shard: touched for shard, touched, _, _ in shards}
+            length_term = sum(term for _, _, term, _ in shards)
+            n_tokens = sum(tokens for _, _, _, tokens in shards)
+            pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+            try:
+                for iteration in range(1, iterations + 1):
+                    start = time.perf_counter()
+                    t_path = os.path.join(directory, f"t{iteration}.npy")
+                    np.save(t_path, t)
+
+                    # 4. E-step per shard, merged into one expected-count array
+                    args = [(directory, shard, t_path) for shard, _, _, _ in shards]
+                    results = (pool.map(em_shard, *zip(*args)) if pool
+                               else (em_shard(*arg) for arg in args))
+                    expected = np.zeros_like(t)
+                    log_likelihood = -length_term
+                    for shard, shard_expected, shard_log_likelihood in results:
+                        expected[touched_of[shard]] += shard_expected
+                        log_likelihood += shard_log_likelihood
+
+                    # 5. M-step: t(f|e) = count(f, e) / sum_f count(f, e)
+                    totals = np.bincount(rows, weights=expected, minlength=n_e)
+                    t = expected / totals[rows]
+                    os.remove(t_path)
+
+                    per_token = log_likelihood / max(n_tokens, 1)
+                    elapsed = time.perf_counter() - start
+                    self.history.append((iteration, log_likelihood, float(np.exp(-per_token)), elapsed))
+                    if verbose:
+                        print(f"iteration {iteration:>3}  log-likelihood {log_likelihood:16.2f}  "
+                              f"perplexity {np.exp(-per_token):10.3f}  {elapsed:6.2f}s")
+                    if len(self.history) > 1:
+                        previous = self.history[-2][1] / max(n_tokens, 1)
+                        if per_token - previous < tol:
+                            break
+            finally:
+                if pool:
+                    pool.shutdown()
+
+        self.t = sparse.csr_matrix((t, indices, indptr), shape=(n_e, n_f))
+        return self
+
+    def probability(self, f, e):
+        """t(f|e), 0.0 for unseen words or pairs."""
+        try:
+            return float(self.t[self.english_vocab.index(e), self.malayalam_vocab.index(f)])
+        except ValueError:
+            return 0.0
+
+    def top_translations(self, k=3):
+        """{English word: [(Malayalam word, t(f|e)), ...]} with the k best f per e."""
+        return top_k_per_row(self.t, self.english_vocab, self.malayalam_vocab, k)
+
+def synthetic_parallel_corpus(n_pairs, vocab_size, seed=0):
+    """
+    Random sentence pairs where each English word e<i> has one Malayalam
+    translation m<perm[i]>, with some words dropped and some noise added,
+    so that EM has a real signal to recover.
+    """
+    rng = np.random.default_rng(seed)
+    translation = rng.permutation(vocab_size)
+    corpus = []
+    for _ in range(n_pairs):
+        e_ids = rng.zipf(1.3, rng.integers(3, 12)) % vocab_size
+        f_ids = translation[e_ids[rng.random(len(e_ids)) > 0.1]]
+        f_ids = np.concatenate([f_ids, rng.integers(0, vocab_size, rng.integers(0, 3))])
+        rng.shuffle(f_ids)
+        corpus.append((" ".join(f"e{i}" for i in e_ids), " ".join(f"m{i}" for i in f_ids)))
+    return corpus, translation
+
+def benchmark_ibm1(n_pairs=200000, vocab_size=5000, iterations=5, worker_counts=(1, 2, 4)):
+    """EM iterations/sec for several worker counts, plus accuracy of the learned argmax t(f|e)."""
+    corpus, translation = synthetic_parallel_corpus(n_pairs, vocab_size)
+    print(f"--- IBM Model 1 ({n_pairs:,} sentence pairs, {os.cpu_count()} CPUs) ---")
+    for workers in worker_counts:
+        model = IBMModel1().fit(corpus, iterations=iterations, workers=workers,
+                                shard_size=max(1, n_pairs // (4 * workers)), tol=0.0, verbose=False)
+        seconds = sum(entry[3] for entry in model.history)
+        best = model.top_translations(k=1)
+        correct = sum(best[e][0][0] == f"m{translation[int(e[1:])]}"
+                      for e in model.english_vocab if e != IBMModel1.NULL)
+        print(f"workers={workers:<3} {len(model.history) / seconds:6.2f} iterations/sec  "
+              f"final perplexity {model.history[-1][2]:.3f}  "
+              f"argmax accuracy {correct / (len(model.english_vocab) - 1):.1%}")
+
+def benchmark_external(pair_counts=(25000, 50000, 100000), vocab_size=5000, memory_budget=1 << 20):
+    """
+    External counting against in-memory cooccurrence_counts() for growing
+    corpora at a fixed memory budget: the peak working memory traced during
+    external counting (more shards, more merge passes) should stay under the
+    budget. The vocabularies and per-word counts, which the budget does not
+    cover, are traced on their own first and reported separately.
+    """
+    print(f"--- External counting ({memory_budget / (1 << 20):g} MB budget) ---")
+    for n_pairs in pair_counts:
+        corpus, _ = synthetic_parallel_corpus(n_pairs, vocab_size)
+
+        start = time.perf_counter()
+        english_vocab, malayalam_vocab, encoded = encode_corpus(corpus)
+        in_memory, _, _ = cooccurrence_counts(encoded, len(english_vocab), len(malayalam_vocab))
+        in_memory_time = time.perf_counter() - start
+        del encoded
+
+        with tempfile.TemporaryDirectory() as directory:
+            eng_path, mal_path, table_path = (os.path.join(directory, name)
+                                              for name in ('en.txt', 'ml.txt', 'table'))
+            with open(eng_path, 'w', encoding='utf-8') as eng_f, open(mal_path, 'w', encoding='utf-8') as mal_f:
+                for eng, mal in corpus:
+                    eng_f.write(eng + '\n')
+                    mal_f.write(mal + '\n')
+
+            tracemalloc.start()
+            english_ids, malayalam_ids = {}, {}
+            for eng, mal in read_parallel_files(eng_path, mal_path):
+                for e in eng.lower().split(): english_ids.setdefault(e, len(english_ids))
+                for f in mal.lower().split(): malayalam_ids.setdefault(f, len(malayalam_ids))
+            word_counts = [0] * len(english_ids), [0] * len(malayalam_ids)
+            vocab = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            del english_ids, malayalam_ids, word_counts
+
+            tracemalloc.start()
+            start = time.perf_counter()
+            count_cooccurrences_external(read_parallel_files(eng_path, mal_path), table_path,
+                                         memory_budget=memory_budget)
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1] - vocab
+            tracemalloc.stop()
+
+            external = load_cooccurrence_table(table_path)
+            identical = (external != in_memory).nnz == 0
+            print(f"{n_pairs:>9,} pairs  in memory {in_memory_time:6.2f}s  external {elapsed:6.2f}s  "
+                  f"vocab {vocab / (1 << 20):5.2f} MB  working peak {peak / (1 << 20):5.2f} MB  "
+                  f"within budget={peak <= memory_budget}  "
+                  f"identical={identical}")
+            del external
+
+def benchmark_sparse(n_pairs=20000, vocab_size=5000, seed=0):
+    """Time the sparse backend on a synthetic parallel corpus."""
+    rng = np.random.default_rng(seed)
+    corpus = [(" ".join(f"e{i}" for i in rng.integers(0, vocab_size, rng.integers(3, 12))),
+               " ".join(f"m{i}" for i in rng.integers(0, vocab_size, rng.integers(3, 12))))
+              for _ in range(n_pairs)]
+
+    start = time.perf_counter()
+    top_f_given_e, _ = sparse_translation_probabilities(corpus)
+    elapsed = time.perf_counter() - start
+    print(f"--- Sparse backend ({n_pairs:,} sentence pairs, ~{vocab_size:,} words per side) ---")
+    print(f"{elapsed:.2f}s for {len(top_f_given_e):,} English words "
+          f"(a dense table would have {vocab_size * vocab_size:,} cells)")
+
 if __name__ == "__main__":
+    if '--benchmark' in sys.argv:
+        benchmark_sparse()
+        benchmark_ibm1()
+        benchmark_external()
+        sys.exit()
+    if '--count-external' in sys.argv:
+        # Usage: question7.py --count-external english.txt malayalam.txt table.bin
+        eng_path, mal_path, table_path = sys.argv[sys.argv.index('--count-external') + 1:][:3]
+        english_vocab, malayalam_vocab, count_e, count_f = count_cooccurrences_external(
+            read_parallel_files(eng_path, mal_path), table_path)
+        counts = load_cooccurrence_table(table_path)
+        top_f_given_e, _ = translation_probabilities_from_counts(
+            counts, count_e, count_f, english_vocab, malayalam_vocab, top_k=3)
+        for e, translations in list(top_f_given_e.items())[:20]:
+            print(f"P(f|{e!r}): {translations}")
+        sys.exit()
+
     compute_translation_probabilities()
\ No newline at end of file
@@ -1,31 +1,350 @@
 from gensim.models import Word2Vec
 from sklearn.decomposition import PCA
-from sklearn.cluster import KMeans
+from sklearn.cluster import KMeans, MiniBatchKMeans
+import matplotlib
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 import numpy as np
+import glob
+import os
+import sys
+import tempfile
+import time
 
+from tokenizer import CachedTokenizer
 
-def word_clustering():
+# gensim silently truncates longer sentences, so split them up front
+MAX_SENTENCE_LENGTH = 10000
+
+
+class SentenceStream:
+    """
+    Re-iterable stream of tokenized sentences (one per line) read from one or
+    more text files. Each iteration re-opens the files, so gensim can make
+    several passes (vocabulary scan + epochs) without the corpus in memory.
+
+    `paths` may be a file, a directory (every file in it), a glob pattern or
+    a list of any of these; shards are read in sorted order.
+    """
+    def __init__(self, paths, lowercase=True, keep_punctuation=False, tokenizer=None):
+        self.paths = self.expand_paths(paths)
+        if not self.paths:
+            raise FileNotFoundError(f"No corpus files found for {paths!r}")
+        self.lowercase = lowercase
+        self.keep_punctuation = keep_punctuation
+        self.tokenizer = tokenizer or CachedTokenizer()
+
+    @staticmethod
+    def expand_paths(paths):
+        if isinstance(paths, (str, os.PathLike)):
+            paths = [paths]
+        expanded = []
+        for path in map(os.fspath, paths):
+            if os.path.isdir(path):
+                expanded.extend(os.path.join(path, name) for name in sorted(os.listdir(path)))
+            elif glob.has_magic(path):
+                expanded.extend(sorted(glob.glob(path)))
+            else:
+                expanded.append(path)
+        return [path for path in expanded if os.path.isfile(path)]
+
+    def tokenize(self, line):
+        tokens = self.tokenizer.tokenize(line.lower() if self.lowercase else line)
+        if not self.keep_punctuation:
+            tokens = [token for token in tokens if any(c.isalnum() for c in token)]
+        return tokens
+
+    def __iter__(self):
+        for path in self.paths:
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    tokens = self.tokenize(line)
+                    for start in range(0, len(tokens), MAX_SENTENCE_LENGTH):
+                        yield tokens[start:start + MAX_SENTENCE_LENGTH]
+
+
+def train_word2vec(sentences, workers=4, batch_words=10000, epochs=5, **params):
+    """
+    Build the vocabulary and train Word2Vec over `sentences` (a list or a
+    re-iterable stream). Returns (model, words/sec of the training passes).
+    """
+    params = {'vector_size': 10, 'window': 2, 'min_count': 1, **params}
+    model = Word2Vec(workers=workers, batch_words=batch_words, epochs=epochs, **params)
+    model.build_vocab(sentences)
+
+    start = time.perf_counter()
+    _, raw_words = model.train(sentences, total_examples=model.corpus_count, epochs=model.epochs)
+    return model, raw_words / (time.perf_counter() - start)
+
+
+def write_synthetic_shards(directory, n_sentences=200000, n_shards=8, vocab_size=20000, seed=0):
+    """Write a two-topic synthetic corpus as n_shards text files; returns their paths."""
+    rng = np.random.default_rng(seed)
+    topics = np.array([f"w{i}" for i in range(vocab_size)]).reshape(2, -1)
+    per_shard = -(-n_sentences // n_shards)
+    paths = []
+    for shard in range(n_shards):
+        path = os.path.join(directory, f"shard{shard:03d}.txt")
+        with open(path, 'w', encoding='utf-8') as f:
+            for _ in range(per_shard):
+                words = rng.choice(topics[rng.integers(2)], rng.integers(5, 20))
+                f.write(" ".join(words) + "\n")
+        paths.append(path)
+    return paths
+
+
+def benchmark_training(n_sentences=200000, worker_counts=(1, 2, 4, 8), batch_sizes=(1000, 10000, 50000)):
+    """Words/sec of Word2Vec training over a sharded SentenceStream for each workers x batch_words."""
+    print(f"--- Word2Vec training ({n_sentences:,} sentences, {os.cpu_count()} CPUs) ---")
+    with tempfile.TemporaryDirectory() as directory:
+        write_synthetic_shards(directory, n_sentences)
+        stream = SentenceStream(directory)
+        print(f"{'workers':>8} {'batch_words':>12} {'words/sec':>12}")
+        for workers in worker_counts:
+            for batch_words in batch_sizes:
+                _, words_per_sec = train_word2vec(stream, workers=workers, batch_words=batch_words,
+                                                  vector_size=100, window=5, min_count=5)
+                print(f"{workers:>8} {batch_words:>12,} {words_per_sec:>12,.0f}")
+
+
+def cluster_vectors(vectors, num_clusters, mode='full', batch_size=4096, random_state=42):
+    """
+    K-Means labels and centroids for `vectors`. mode='full' is the original
+    KMeans(n_init=10); mode='minibatch' fits MiniBatchKMeans on random
+    batches, which scales to vocabularies of hundreds of thousands of words.
+    """
+    if mode == 'full':
+        kmeans = KMeans(n_clusters=num_clusters, random_state=random_state, n_init=10)
+    elif mode == 'minibatch':
+        kmeans = MiniBatchKMeans(n_clusters=num_clusters, random_state=random_state,
+                                 batch_size=batch_size, n_init=3)
+    else:
+        raise ValueError(f"Unknown clustering mode {mode!r}, expected 'full' or 'minibatch'")
+    kmeans.fit(vectors)
+    return kmeans.labels_, kmeans.cluster_centers_
+
+
+def normalize_rows(vectors):
+    """Unit-length float32 copy of `vectors` (zero rows stay zero)."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, np.float32(1e-12))
+
+
+class IVFIndex:
+    """
+    Inverted-file approximate nearest-neighbour index for cosine similarity.
+
+    Vectors are normalized to float32 and assigned to their most similar
+    centroid (e.g. the k-means centroids from clustering); each centroid's
+    list is stored contiguously. A query scores the centroids, then scans
+    only the `nprobe` best lists instead of the whole vocabulary.
+
+    Only the list-ordered copy of the vectors is kept: `ids` maps a row to
+    its word id and `rows` maps a word id back to its row.
+    """
+    def __init__(self, words, vectors, centroids, nprobe=8, assign_batch=65536):
+        self.words = list(words)
+        self.word_index = {word: i for i, word in enumerate(self.words)}
+        self.centroids = normalize_rows(centroids)
+        self.nprobe = nprobe
+        vectors = np.asarray(vectors)
+
+        # Assign in batches so the (batch x centroids) score matrix and the
+        # normalized batch stay small
+        lists = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(lists), assign_batch):
+            scores = normalize_rows(vectors[start:start + assign_batch]) @ self.centroids.T
+            lists[start:start + assign_batch] = scores.argmax(axis=1)
+
+        # Lay each inverted list out contiguously, normalizing batch by batch
+        # straight into list order
+        self.ids = np.argsort(lists, kind='stable')
+        self.rows = np.empty_like(self.ids)
+        self.rows[self.ids] = np.arange(len(self.ids))
+        self.list_vectors = np.empty((len(vectors), self.centroids.shape[1]), dtype=np.float32)
+        for start in range(0, len(lists), assign_batch):
+            batch = self.ids[start:start + assign_batch]
+            self.list_vectors[start:start + assign_batch] = normalize_rows(vectors[batch])
+        self.offsets = np.zeros(len(self.centroids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(lists, minlength=len(self.centroids)), out=self.offsets[1:])
+
+    def vector(self, i):
+        """Normalized vector of word id i."""
+        return self.list_vectors[self.rows[i]]
+
+    def _top_k(self, scores, ids, k, exclude):
+        if exclude is not None:
+            scores = np.where(ids == exclude, -np.inf, scores)
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+        top = top[np.argsort(-scores[top])]
+        return [(self.words[ids[i]], float(scores[i])) for i in top if np.isfinite(scores[i])]
+
+    def search(self, vector, k=10, nprobe=None, exclude=None):
+        """Approximate top-k [(word, cosine)] for a query vector."""
+        query = normalize_rows(np.reshape(vector, (1, -1)))[0]
+        nprobe = min(nprobe or self.nprobe, len(self.centroids))
+        probes = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        ids = np.concatenate([self.ids[self.offsets[c]:self.offsets[c + 1]] for c in probes])
+        vectors = np.concatenate([self.list_vectors[self.offsets[c]:self.offsets[c + 1]] for c in probes])
+        return self._top_k(vectors @ query, ids, k, exclude)
+
+    def search_exact(self, vector, k=10, exclude=None):
+        """Brute-force top-k over every vector, for comparison."""
+        query = normalize_rows(np.reshape(vector, (1, -1)))[0]
+        return self._top_k(self.list_vectors @ query, self.ids, k, exclude)
+
+    def most_similar(self, word, k=10, nprobe=None):
+        """Approximate neighbours of a vocabulary word, excluding the word itself."""
+        i = self.word_index[word]
+        return self.search(self.vector(i), k, nprobe, exclude=i)
+
+
+def mean_squared_distance(vectors, labels, centroids, batch=65536):
+    """K-Means objective (inertia / n) of a clustering, computed in batches."""
+    total = 0.0
+    for start in range(0, len(vectors), batch):
+        diff = vectors[start:start + batch] - centroids[labels[start:start + batch]]
+        total += float(np.einsum('ij,ij->', diff, diff))
+    return total / max(len(vectors), 1)
+
+
+def benchmark_index(n_words=100000, dim=100, n_topics=1000, num_clusters=256, n_queries=200,
+                    k=10, nprobes=(1, 4, 16, 64)):
+    """
+    Clustering time and objective of full against mini-batch K-Means on the
+    same vectors and number of clusters, then IVF query latency and recall@k
+    against exact search, on synthetic clustered vectors.
+    """
+    print(f"--- Clustering and ANN index ({n_words:,} x {dim} vectors, {num_clusters} clusters) ---")
+    rng = np.random.default_rng(0)
+    topics = rng.normal(size=(n_topics, dim)).astype(np.float32)
+    vectors = topics[rng.integers(n_topics, size=n_words)] + 0.5 * rng.normal(size=(n_words, dim)).astype(np.float32)
+    words = [f"w{i}" for i in range(n_words)]
+    unit_vectors = normalize_rows(vectors)
+
+    for mode in ('full', 'minibatch'):
+        start = time.perf_counter()
+        labels, centroids = cluster_vectors(unit_vectors, num_clusters, mode=mode)
+        elapsed = time.perf_counter() - start
+        print(f"{mode:<10} K-Means  {elapsed:8.2f}s  "
+              f"mean squared distance {mean_squared_distance(unit_vectors, labels, centroids):.4f}")
+    del unit_vectors
+
+    # The index reuses the mini-batch centroids
+    start = time.perf_counter()
+    index = IVFIndex(words, vectors, centroids)
+    print(f"IVF build            {time.perf_counter() - start:8.2f}s")
+
+    queries = rng.choice(n_words, size=n_queries, replace=False)
+    start = time.perf_counter()
+    exact = [{w for w, _ in index.search_exact(index.vector(q), k, exclude=q)} for q in queries]
+    exact_ms = (time.perf_counter() - start) * 1000 / n_queries
+    print(f"exact search         {exact_ms:8.3f} ms/query  recall@{k} 1.000")
+
+    for nprobe in nprobes:
+        start = time.perf_counter()
+        found = [{w for w, _ in index.search(index.vector(q), k, nprobe=nprobe, exclude=q)} for q in queries]
+        ms = (time.perf_counter() - start) * 1000 / n_queries
+        recall = sum(len(a & b) for a, b in zip(found, exact)) / sum(len(b) for b in exact)
+        print(f"IVF nprobe={nprobe:<4}     {ms:8.3f} ms/query  recall@{k} {recall:.3f}  "
+              f"speedup x{exact_ms / ms:.1f}")
+
+
+def plot_clusters(reduced_vectors, clusters, words, path='Q8OUTPUT.png', max_labels=50,
+                  title='Word Clustering using Word2Vec & PCA'):
+    """
+    Render all points in one scatter call, colored by cluster, and label
+    only the first max_labels words (gensim orders the vocabulary by
+    frequency, so these are the most frequent ones). The figure is drawn on
+    a standalone Agg-backed Figure rather than through pyplot, so it works
+    on headless machines and never opens a window or blocks.
+    """
+    clusters = np.asarray(clusters)
+    fig = Figure(figsize=(10, 8))
+    ax = fig.subplots()
+
+    # One color per cluster id: qualitative palettes while they last, then hsv
+    num_clusters = int(clusters.max(initial=0)) + 1
+    if num_clusters <= 20:
+        palette = matplotlib.colormaps['tab10' if num_clusters <= 10 else 'tab20'].colors
+        colors = np.asarray(palette)[clusters]
+    else:
+        colors = matplotlib.colormaps['hsv'](clusters / num_clusters)
+
+    # Smaller, edge-less markers once there are too many points to tell apart
+    dense = len(words) > 1000
+    ax.scatter(reduced_vectors[:, 0], reduced_vectors[:, 1], c=colors,
+               s=4 if dense else 100, alpha=0.7, edgecolors='none' if dense else 'k',
+               rasterized=dense)
+
+    # Offset labels in screen points, so they stay next to their point at any data scale
+    for i in range(min(max_labels, len(words))):
+        ax.annotate(words[i], reduced_vectors[i], xytext=(4, 4), textcoords='offset points',
+                    fontsize=8 if dense else 12)
+
+    ax.set_title(title)
+    ax.set_xlabel('Principal Component 1')
+    ax.set_ylabel('Principal Component 2')
+    ax.grid(True, linestyle='--', alpha=0.5)
+    fig.savefig(path)
+    return path
+
+
+def benchmark_plotting(vocab_sizes=(100, 1000, 10000, 50000), max_loop_size=2000):
+    """Seconds to render the plot per word (as in word_clustering) against plot_clusters()."""
+    print("--- Plotting (per-word scatter/text vs one vectorized scatter) ---")
+    print(f"{'words':>8} {'per-word':>10} {'vectorized':>11}")
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'plot.png')
+        for n_words in vocab_sizes:
+            points = rng.normal(size=(n_words, 2))
+            clusters = rng.integers(2, size=n_words)
+            words = [f"w{i}" for i in range(n_words)]
+
+            per_word = 'skipped'
+            if n_words <= max_loop_size:
+                start = time.perf_counter()
+                fig = Figure(figsize=(10, 8))
+                ax = fig.subplots()
+                for i, word in enumerate(words):
+                    x, y = points[i]
+                    ax.scatter(x, y, c=['red', 'blue'][clusters[i]], s=100, alpha=0.7, edgecolors='k')
+                    ax.text(x + 0.02, y + 0.02, word, fontsize=12)
+                fig.savefig(path)
+                per_word = f"{time.perf_counter() - start:.2f}s"
+
+            start = time.perf_counter()
+            plot_clusters(points, clusters, words, path)
+            vectorized = time.perf_counter() - start
+            print(f"{n_words:>8,} {per_word:>10} {vectorized:>10.2f}s")
+
+
+def word_clustering(sentences=None, workers=4, clustering='full', fast_plot=False):
     # 1. Prepare Data (Corpus)
-    # We create a small dummy corpus with two distinct topics:
+    # Unless a corpus (e.g. a SentenceStream) is given, we create a small
+    # dummy corpus with two distinct topics:
     # Topic A: Computers/Tech
     # Topic B: Nature/Outdoors
-    sentences = [
-        ['computer', 'system', 'interface', 'user'],
-        ['user', 'response', 'time', 'code'],
-        ['computer', 'code', 'program', 'system'],
-        ['interface', 'system', 'user', 'eps'],
-        ['tree', 'forest', 'rain', 'grass'],
-        ['grass', 'ground', 'tree', 'green'],
-        ['rain', 'river', 'water', 'forest'],
-        ['river', 'fish', 'water', 'swim']
-    ]
+    if sentences is None:
+        sentences = [
+            ['computer', 'system', 'interface', 'user'],
+            ['user', 'response', 'time', 'code'],
+            ['computer', 'code', 'program', 'system'],
+            ['interface', 'system', 'user', 'eps'],
+            ['tree', 'forest', 'rain', 'grass'],
+            ['grass', 'ground', 'tree', 'green'],
+            ['rain', 'river', 'water', 'forest'],
+            ['river', 'fish', 'water', 'swim']
+        ]
 
     print("1. Training Word2Vec Model...")
     # vector_size=10: We create small 10-dimensional vectors (since data is small)
     # min_count=1: 
     # window=2: Context window size
-    model = Word2Vec(sentences, vector_size=10, window=2, min_count=1, workers=4)
+    model, _ = train_word2vec(sentences, workers=workers, vector_size=10, window=2, min_count=1)
 
     # Extract vocabulary and vectors
     words = list(model.wv.index_to_key)
@@ -39,9 +358,7 @@ def word_clustering():
     num_clusters = 2
     print(f"\n2. Clustering words into {num_clusters} groups using K-Means...")
     
-    kmeans = KMeans(n_clusters=num_clusters, random_state=42, n_init=10)
-    kmeans.fit(word_vectors)
-    clusters = kmeans.labels_
+    clusters, centroids = cluster_vectors(word_vectors, num_clusters, mode=clustering)
 
     # Print Cluster Results
     print("-" * 40)
@@ -50,6 +367,10 @@ def word_clustering():
     for word, cluster in zip(words, clusters):
         print(f"{word:<15} {cluster}")
 
+    # Nearest neighbours through an IVF index over the same centroids
+    index = IVFIndex(words, word_vectors, centroids, nprobe=1)
+    print(f"\n   Nearest to '{words[0]}': {[w for w, _ in index.most_similar(words[0], k=3)]}")
+
     # 3. Dimensionality Reduction (PCA)
     # Reduce 10 dimensions -> 2 dimensions for plotting
     print("\n3. Applying PCA for visualization...")
@@ -58,6 +379,11 @@ def word_clustering():
 
     # 4. Plotting
     print("4. Generating Plot...")
+    if fast_plot:
+        plot_clusters(reduced_vectors, clusters, words, 'Q8OUTPUT.png')
+        print("   Plot saved as 'Q8OUTPUT.png'")
+        return
+
     plt.figure(figsize=(10, 8))
     
     # Define colors for clusters (0 = Red, 1 = Blue)
@@ -84,4 +410,24 @@ def word_clustering():
     plt.show()
 
 if __name__ == "__main__":
-    word_clustering()
\ No newline at end of file
+    if '--benchmark' in sys.argv:
+        benchmark_training()
+        sys.exit()
+    if '--benchmark-index' in sys.argv:
+        benchmark_index()
+        sys.exit()
+    if '--benchmark-plot' in sys.argv:
+        benchmark_plotting()
+        sys.exit()
+
+    options = {
+        'clustering': 'minibatch' if '--minibatch' in sys.argv else 'full',
+        # --fast-plot: vectorized, headless rendering without plt.show()
+        'fast_plot': '--fast-plot' in sys.argv,
+    }
+    if '--corpus' in sys.argv:
+        # Usage: question8.py [--minibatch] [--fast-plot] --corpus <file | directory | 'glob'> ...
+        paths = [arg for arg in sys.argv[sys.argv.index('--corpus') + 1:] if not arg.startswith('--')]
+        word_clustering(SentenceStream(paths), **options)
+    else:
+        word_clustering(**options)
\ No newline at end of file
@@ -1,3 +1,9 @@
+import sys
+import time
+
+import numpy as np
+
+
 class PluralFSA:
     def __init__(self):
         self.vowels = set('aeiou')
@@ -18,6 +24,18 @@ class PluralFSA:
             print("ACCEPTED")
         else:
             print("REJECTED")
+        return self.state == 'q_accept'
+
+    def accepts(self, word):
+        """Run the automaton over `word` without printing."""
+        self.reset()
+        for char in word:
+            self.transition(char)
+        return self.state == 'q_accept'
+
+    def compile(self):
+        """Table-driven CompiledPluralFSA with the same behaviour as transition()."""
+        return CompiledPluralFSA(self)
 
     def transition(self, char):
         # Helper to identify character type
@@ -86,7 +104,135 @@ class PluralFSA:
         elif char.isalpha(): self.state = 'q_consonant'
         else: self.state = 'q_reject'
 
+class CompiledPluralFSA:
+    """
+    PluralFSA compiled to integer states, a character-class map and a
+    (state x class) transition table.
+
+    The table is derived by running PluralFSA.transition() from every
+    reachable state on every ASCII character, so it cannot drift from the
+    hand-written rules. Characters that behave identically in every state
+    share a class. Non-ASCII characters are never special in the rules:
+    letters act like 'b' and anything else like '!'.
+    """
+    def __init__(self, fsa=None):
+        fsa = fsa or PluralFSA()
+        chars = [chr(code) for code in range(128)]
+
+        # 1. Discover reachable states and their transitions on every character
+        fsa.reset()
+        self.state_names = [fsa.state]
+        transitions = {}
+        for name in self.state_names:  # grows while iterating (breadth-first)
+            row = []
+            for char in chars:
+                fsa.state = name
+                fsa.transition(char)
+                if fsa.state not in self.state_names:
+                    self.state_names.append(fsa.state)
+                row.append(fsa.state)
+            transitions[name] = row
+        fsa.reset()
+        state_ids = {name: i for i, name in enumerate(self.state_names)}
+
+        # 2. Group characters with identical columns into classes
+        signatures = {}
+        self.char_class = np.empty(128, dtype=np.uint8)
+        for code in range(128):
+            signature = tuple(state_ids[transitions[name][code]] for name in self.state_names)
+            self.char_class[code] = signatures.setdefault(signature, len(signatures))
+
+        # 3. Transition table: table[state, class] -> next state
+        self.table = np.empty((len(self.state_names), len(signatures)), dtype=np.uint8)
+        for signature, char_class in signatures.items():
+            self.table[:, char_class] = signature
+
+        self.start = state_ids['q_start']
+        self.accept = state_ids['q_accept']
+        self._class_list = self.char_class.tolist()
+        self._rows = self.table.tolist()
+
+    def _ascii(self, word):
+        """Replace non-ASCII characters by an ASCII character of the same class."""
+        if word.isascii():
+            return word
+        return ''.join(c if c.isascii() else 'b' if c.isalpha() else '!' for c in word)
+
+    def accepts(self, word):
+        """True if the automaton ends in the accept state on `word`."""
+        state, rows, classes = self.start, self._rows, self._class_list
+        for char in self._ascii(word):
+            state = rows[state][classes[ord(char)]]
+        return state == self.accept
+
+    def pack(self, words):
+        """Pack words into one uint8 byte buffer plus int64 offsets (len(words) + 1)."""
+        words = [self._ascii(word) for word in words]
+        buffer = np.frombuffer(''.join(words).encode('ascii'), dtype=np.uint8)
+        offsets = np.zeros(len(words) + 1, dtype=np.int64)
+        np.cumsum([len(word) for word in words], out=offsets[1:])
+        return buffer, offsets
+
+    def classify_packed(self, buffer, offsets):
+        """
+        Boolean acceptance array for words packed as (buffer, offsets).
+        All words advance one character per step; words are processed
+        longest first, so the still-running ones are always a prefix.
+        """
+        starts = offsets[:-1]
+        lengths = np.diff(offsets)
+        order = np.argsort(-lengths, kind='stable')
+        starts, lengths = starts[order], lengths[order]
+        classes = self.char_class[buffer]
+
+        states = np.full(len(order), self.start, dtype=np.uint8)
+        # active[j] = number of words longer than j
+        active = np.searchsorted(-lengths, -np.arange(lengths[0] if len(lengths) else 0), side='left')
+        for position, n_active in enumerate(active):
+            states[:n_active] = self.table[states[:n_active], classes[starts[:n_active] + position]]
+
+        accepted = np.empty(len(order), dtype=bool)
+        accepted[order] = states == self.accept
+        return accepted
+
+    def classify_many(self, words):
+        """accepts() for every word of a list, as a NumPy boolean array."""
+        return self.classify_packed(*self.pack(words))
+
+
+def benchmark_fsa(n_words=1000000, seed=0):
+    """Words/sec of PluralFSA.accepts() against the compiled accepts() and classify_many()."""
+    rng = np.random.default_rng(seed)
+    letters = np.array(list('abcdefghijklmnopqrstuvwxyz'))
+    suffixes = ['s', 'ys', 'ies', 'es', '']
+    words = ["".join(rng.choice(letters, rng.integers(2, 9))) + suffixes[rng.integers(len(suffixes))]
+             for _ in range(n_words)]
+    fsa = PluralFSA()
+    compiled = fsa.compile()
+    print(f"--- PluralFSA over {n_words:,} words ---")
+
+    start = time.perf_counter()
+    reference = [fsa.accepts(word) for word in words]
+    baseline = time.perf_counter() - start
+    print(f"PluralFSA.accepts       {n_words / baseline:>12,.0f} words/sec")
+
+    start = time.perf_counter()
+    single = [compiled.accepts(word) for word in words]
+    elapsed = time.perf_counter() - start
+    print(f"compiled accepts        {n_words / elapsed:>12,.0f} words/sec  speedup x{baseline / elapsed:.1f}")
+
+    start = time.perf_counter()
+    batch = compiled.classify_many(words)
+    elapsed = time.perf_counter() - start
+    print(f"compiled classify_many  {n_words / elapsed:>12,.0f} words/sec  speedup x{baseline / elapsed:.1f}")
+    print(f"Same results? {'Yes' if reference == single == batch.tolist() else 'No'}")
+
+
 if __name__ == "__main__":
+    if '--benchmark' in sys.argv:
+        benchmark_fsa()
+        sys.exit()
+
     fsa = PluralFSA()
     
     # Test Cases
@@ -104,4 +250,10 @@ if __name__ == "__main__":
     
     print("--- Finite State Automaton Output ---")
     for w in test_words:
-        fsa.process_word(w)
\ No newline at end of file
+        fsa.process_word(w)
+
+    compiled = fsa.compile()
+    print(f"\n--- Compiled DFA ({len(compiled.state_names)} states, "
+          f"{compiled.table.shape[1]} character classes) ---")
+    for w, accepted in zip(test_words, compiled.classify_many(test_words)):
+        print(f"{w:<10} {'ACCEPTED' if accepted else 'REJECTED'}")
\ No newline at end of file